@@ -0,0 +1,211 @@
+import csv
+import os
+import re
+import uuid
+from datetime import datetime
+
+from config import Config
+from passwords import password_hasher
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# CSV columns understood by the importer; email and name are required
+PROFILE_COLUMNS = ('batch_year', 'department', 'current_job', 'company', 'location', 'linkedin_url')
+REQUIRED_COLUMNS = ('email', 'name')
+
+
+def normalize_header(name):
+    return (name or '').strip().lower().replace(' ', '_')
+
+
+def missing_columns(header):
+    """Required columns absent from a CSV header row"""
+    present = {normalize_header(name) for name in header}
+    return [column for column in REQUIRED_COLUMNS if column not in present]
+
+
+def _read_rows(path):
+    """Yield (row number, dict) with normalized column names; row 1 is the header"""
+    with open(path, newline='', encoding='utf-8-sig') as source:
+        reader = csv.reader(source)
+        header = [normalize_header(name) for name in next(reader, [])]
+        for row_number, values in enumerate(reader, start=2):
+            if not any(value.strip() for value in values):
+                continue
+            yield row_number, {column: value.strip() for column, value in zip(header, values)}
+
+
+def _count_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as source:
+        return max(sum(1 for _ in csv.reader(source)) - 1, 0)
+
+
+def _validate(row, max_batch_year):
+    """Clean (user, profile) values for one row, or raise ValueError"""
+    email = row.get('email', '')
+    if not EMAIL_PATTERN.match(email):
+        raise ValueError('Invalid email address')
+    if not row.get('name'):
+        raise ValueError('Name is required')
+
+    batch_year = row.get('batch_year') or None
+    if batch_year is not None:
+        try:
+            batch_year = int(batch_year)
+        except ValueError:
+            raise ValueError('Batch year must be a number')
+        if not 1900 <= batch_year <= max_batch_year:
+            raise ValueError(f'Batch year must be between 1900 and {max_batch_year}')
+
+    profile = [row.get('name'), batch_year] + [row.get(column) or None for column in PROFILE_COLUMNS[1:]]
+    return email, row.get('password') or None, profile
+
+
+class _ErrorReport:
+    """Per-row error CSV, created in EXPORT_FOLDER on the first error"""
+
+    def __init__(self, filename=None, count=0, size=0):
+        self.filename = filename
+        self.count = count
+        self._file = None
+        self._writer = None
+        if filename:
+            # Resuming: drop rows written after the checkpoint, they are checked again
+            self._file = open(os.path.join(Config.EXPORT_FOLDER, filename), 'r+', newline='', encoding='utf-8')
+            self._file.truncate(size)
+            self._file.seek(size)
+            self._writer = csv.writer(self._file)
+
+    def add(self, row_number, email, error):
+        if self._file is None:
+            os.makedirs(Config.EXPORT_FOLDER, exist_ok=True)
+            self.filename = f'alumni_import_errors_{uuid.uuid4().hex[:8]}.csv'
+            self._file = open(os.path.join(Config.EXPORT_FOLDER, self.filename), 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(['Row', 'Email', 'Error'])
+        self._writer.writerow([row_number, email, error])
+        self.count += 1
+
+    def size(self):
+        """Bytes written so far, all of them on disk"""
+        if self._file is None:
+            return 0
+        self._file.flush()
+        return self._file.tell()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _insert_chunk(db, users, profiles, checkpoint=None):
+    """Insert one chunk of users and their profiles in a single transaction;
+    `checkpoint(cursor)` records the progress in the same transaction"""
+    with db.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO users (email, password, role, is_verified)
+            VALUES (?, ?, 'alumni', ?)
+        """, users)
+        # Profiles find their user through the unique email index
+        cursor.executemany(f"""
+            INSERT INTO alumni_profiles (user_id, name, {', '.join(PROFILE_COLUMNS)})
+            SELECT id, ?, ?, ?, ?, ?, ?, ? FROM users WHERE email = ?
+        """, profiles)
+        if checkpoint:
+            checkpoint(cursor)
+
+
+def import_alumni(db, path, auto_verify=False, default_password_hash=None, progress=None,
+                  resume=None, save_checkpoint=None):
+    """Create alumni accounts and profiles from a CSV file.
+
+    Rows are validated and de-duplicated (within the file and against
+    existing users) in one pass, then inserted IMPORT_CHUNK_SIZE at a time.
+    Per-row passwords are bcrypt-hashed a chunk at a time on the password
+    hasher's import pool, apart from the threads logins use. Rejected rows are written to an error report CSV.
+
+    With `save_checkpoint(cursor, state)` every chunk records how far the
+    import got in its own transaction; passing that state back as `resume`
+    continues after the last committed chunk with the same totals and
+    error report, instead of reporting those rows as already registered.
+    """
+    resume = resume or {}
+    total = _count_rows(path)
+    imported = resume.get('imported', 0)
+    processed = resume.get('processed', 0)
+    done_through = resume.get('row', 0)  # rows up to this one are committed
+    if progress:
+        progress(processed, total)
+
+    # Every existing address, loaded once instead of queried per row
+    seen = {row['email'] for row in db.iter_query("SELECT lower(email) as email FROM users")}
+    first_row = {}
+    report = _ErrorReport(resume.get('error_report'), resume.get('errors', 0), resume.get('error_report_size', 0))
+    max_batch_year = datetime.now().year + 10
+    users, profiles = [], []
+    passwords = {}  # index in `users` -> plain password still to be hashed
+    last_row = done_through
+
+    def flush():
+        nonlocal imported
+        if users or save_checkpoint:
+            hashes = password_hasher.hash_many(list(passwords.values()))
+            for index, password_hash in zip(passwords, hashes):
+                users[index] = (users[index][0], password_hash, users[index][2])
+            state = {'row': last_row, 'processed': processed, 'imported': imported + len(users),
+                     'errors': report.count, 'error_report': report.filename, 'error_report_size': report.size()}
+            _insert_chunk(db, users, profiles,
+                          checkpoint=(lambda cursor: save_checkpoint(cursor, state)) if save_checkpoint else None)
+            imported += len(users)
+            users.clear()
+            profiles.clear()
+            passwords.clear()
+
+    try:
+        for row_number, row in _read_rows(path):
+            if row_number <= done_through:
+                # Committed by an earlier attempt; only remember where each address first appeared
+                try:
+                    email = _validate(row, max_batch_year)[0].lower()
+                    first_row.setdefault(email, row_number)
+                except ValueError:
+                    pass
+                continue
+            processed += 1
+            last_row = row_number
+            email = row.get('email', '')
+            try:
+                email, password, profile = _validate(row, max_batch_year)
+                key = email.lower()
+                if key in seen:
+                    if key in first_row:
+                        raise ValueError(f'Duplicate of row {first_row[key]}')
+                    raise ValueError('Email already registered')
+                if not password and not default_password_hash:
+                    raise ValueError('No password given and no default password set')
+            except ValueError as err:
+                report.add(row_number, email, str(err))
+                continue
+
+            seen.add(key)
+            first_row[key] = row_number
+            if password:
+                passwords[len(users)] = password
+            users.append((email, None if password else default_password_hash, bool(auto_verify)))
+            profiles.append(profile + [email])
+            if len(users) >= Config.IMPORT_CHUNK_SIZE:
+                flush()
+                if progress:
+                    progress(processed)
+        flush()
+    finally:
+        report.close()
+
+    if progress:
+        progress(processed)
+    return {
+        'rows': processed,
+        'imported': imported,
+        'errors': report.count,
+        'error_report': report.filename,
+    }
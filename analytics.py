@@ -0,0 +1,128 @@
+"""Hourly and daily activity counts for the admin charts.
+
+Each metric is kept in the `stats_rollups` table by SQLite triggers on its
+source table, so a chart reads one row per bucket instead of scanning the
+source rows. Periods are UTC, like the CURRENT_TIMESTAMP defaults they
+are derived from.
+"""
+
+from datetime import datetime, timedelta
+
+BUCKETS = {
+    # bucket -> (strftime format for a timestamp, Python format, step)
+    'hour': ('%Y-%m-%d %H:00', '%Y-%m-%d %H:00', timedelta(hours=1)),
+    'day': ('%Y-%m-%d', '%Y-%m-%d', timedelta(days=1)),
+}
+
+# metric -> (table, timestamp expression, condition on the row)
+# Inside triggers the row is NEW/OLD; in rebuild() it is the table itself.
+METRICS = {
+    'signups': ('users', '{row}.created_at', "{row}.role = 'alumni'"),
+    'registrations': ('event_registrations', '{row}.registered_at', '1'),
+    'attendance': ('event_registrations', '(SELECT event_date FROM events WHERE id = {row}.event_id)',
+                   '{row}.attended = 1'),
+    'messages': ('messages', '{row}.created_at', '1'),
+    'posts': ('forum_posts', '{row}.created_at', '1'),
+    'jobs': ('job_postings', '{row}.created_at', '1'),
+}
+
+
+def _bump(metric, timestamp, delta):
+    """Statements adding `delta` to every bucket containing `timestamp`"""
+    return '\n'.join(f"""
+            INSERT INTO stats_rollups (metric, bucket, period, count)
+            VALUES ('{metric}', '{bucket}', strftime('{sql_format}', {timestamp}), {delta})
+            ON CONFLICT (metric, bucket, period) DO UPDATE SET count = count + excluded.count;"""
+                     for bucket, (sql_format, _, _) in BUCKETS.items())
+
+
+def _triggers(metric):
+    table, timestamp, condition = METRICS[metric]
+    new_ts, new_cond = timestamp.format(row='NEW'), condition.format(row='NEW')
+    old_ts, old_cond = timestamp.format(row='OLD'), condition.format(row='OLD')
+    yield f"""
+        CREATE TRIGGER IF NOT EXISTS rollup_{metric}_insert AFTER INSERT ON {table}
+        WHEN {new_cond} AND {new_ts} IS NOT NULL
+        BEGIN {_bump(metric, new_ts, 1)}
+        END
+    """
+    yield f"""
+        CREATE TRIGGER IF NOT EXISTS rollup_{metric}_delete AFTER DELETE ON {table}
+        WHEN {old_cond} AND {old_ts} IS NOT NULL
+        BEGIN {_bump(metric, old_ts, -1)}
+        END
+    """
+    if metric == 'attendance':
+        # Check-ins and their reversal are updates, not inserts
+        yield f"""
+            CREATE TRIGGER IF NOT EXISTS rollup_{metric}_update AFTER UPDATE OF attended ON {table}
+            WHEN (NEW.attended = 1) != (OLD.attended = 1) AND {new_ts} IS NOT NULL
+            BEGIN {_bump(metric, new_ts, 'CASE WHEN NEW.attended = 1 THEN 1 ELSE -1 END')}
+            END
+        """
+        # Attendance is bucketed by the event's date: move it when the event moves
+        attended = "(SELECT COUNT(*) FROM event_registrations WHERE event_id = NEW.id AND attended = 1)"
+        yield f"""
+            CREATE TRIGGER IF NOT EXISTS rollup_{metric}_event_moved AFTER UPDATE OF event_date ON events
+            WHEN OLD.event_date IS NOT NEW.event_date
+                 AND OLD.event_date IS NOT NULL AND NEW.event_date IS NOT NULL
+                 AND EXISTS (SELECT 1 FROM event_registrations WHERE event_id = NEW.id AND attended = 1)
+            BEGIN {_bump(metric, 'OLD.event_date', f'-{attended}')}
+                  {_bump(metric, 'NEW.event_date', attended)}
+            END
+        """
+
+
+def install(db):
+    """Create the rollup triggers; backfill the rollups the first time"""
+    for metric in METRICS:
+        for trigger in _triggers(metric):
+            db.execute_query(trigger)
+    if db.execute_single("SELECT 1 as found FROM stats_rollups LIMIT 1") is None:
+        rebuild(db)
+
+
+def rebuild(db):
+    """Recompute every rollup from the source tables in one transaction"""
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM stats_rollups")
+        for metric, (table, timestamp, condition) in METRICS.items():
+            timestamp, condition = timestamp.format(row=table), condition.format(row=table)
+            for bucket, (sql_format, _, _) in BUCKETS.items():
+                cursor.execute(f"""
+                    INSERT INTO stats_rollups (metric, bucket, period, count)
+                    SELECT ?, ?, strftime('{sql_format}', {timestamp}) as period, COUNT(*)
+                    FROM {table}
+                    WHERE {condition} AND period IS NOT NULL
+                    GROUP BY period
+                """, (metric, bucket))
+
+
+def periods(bucket, start, end):
+    """Every period label of `bucket` from `start` to `end` inclusive"""
+    _, python_format, step = BUCKETS[bucket]
+    current = datetime.strptime(start.strftime(python_format), python_format)
+    labels = []
+    while current <= end:
+        labels.append(current.strftime(python_format))
+        current += step
+    return labels
+
+
+def series(db, metrics, bucket, start, end):
+    """{metric: [count per period]} plus the period labels, zero-filled"""
+    labels = periods(bucket, start, end)
+    result = {metric: [0] * len(labels) for metric in metrics}
+    if not labels:
+        return labels, result
+    index = {label: position for position, label in enumerate(labels)}
+    placeholders = ','.join(['?' for _ in metrics])
+    rows = db.execute_query(f"""
+        SELECT metric, period, count FROM stats_rollups
+        WHERE metric IN ({placeholders}) AND bucket = ? AND period BETWEEN ? AND ?
+    """, list(metrics) + [bucket, labels[0], labels[-1]]) or []
+    for row in rows:
+        position = index.get(row['period'])
+        if position is not None:
+            result[row['metric']][position] = row['count']
+    return labels, result
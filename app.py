@@ -1,21 +1,72 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file
-import hashlib
+import time
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file, send_from_directory, Response, abort, g
+import csv
 import os
+import uuid
 from datetime import datetime, timedelta
 import json
-from models import Database, init_database
+from models import Database, init_database, conversation_key
 from config import Config, allowed_file
+from live_status import LiveStatusBoard
+from unread import BROADCAST_RECIPIENT_SQL, UnreadCounts
+from streams import StreamSlots
+from jobs import job_queue
+import tasks  # registers background job handlers
+from cache import TTLCache, app_cache
+from changelog import change_feed
+from user_context import UserContext
+from passwords import PasswordHasherBusy, password_hasher
+from assets import Assets
+from compression import CompressionMiddleware
+from templating import install_bytecode_cache, warm_up
+from fragments import Deferred, fragment_cache
+from metrics import metrics
+from stats import dashboard_stats
+from storage import FileStore, FileTooLarge, is_content_addressed, split_name
+import analytics
+from ical import FeedCache, build_calendar
+from exports import EXPORTS, FORMATS, wants_gzip
+from alumni_import import missing_columns
+from recurrence import FREQUENCIES, occurrences, occurrences_between, parse_event_datetime
 from werkzeug.utils import secure_filename
-import csv
-import io
+from itsdangerous import URLSafeSerializer, BadSignature
 
 app = Flask(__name__)
 app.config.from_object(Config)
+assets = Assets(app)
+fragment_cache.init_app(app)
+app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+
+db = Database(mark_origin=True)  # routes update local state as they write; see refresh_local_state
+live_board = LiveStatusBoard(db)
+unread_counts = UnreadCounts(db)
+stream_slots = StreamSlots()
+calendar_feeds = FeedCache()
+calendar_signer = URLSafeSerializer(Config.SECRET_KEY, salt='calendar-feed')
+recipient_cache = TTLCache(ttl=Config.RECIPIENT_SEARCH_CACHE_TTL)
+file_store = FileStore(db)
+file_access_cache = TTLCache(ttl=Config.FILE_ACCESS_CACHE_TTL)
+user_context = UserContext(db)
+
+def events_changed():
+    """Refresh everything derived from the events table"""
+    live_board.invalidate()
+    calendar_feeds.invalidate()
+    dashboard_stats.invalidate()
+    app_cache.invalidate('events')
+
+def profiles_changed(*user_ids):
+    """Refresh cached data built from alumni profiles (directory filters, user context)"""
+    app_cache.invalidate('profiles')
+    user_context.invalidate(*user_ids)
 
-# Ensure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+dashboard_stats.subscribe(lambda: app_cache.invalidate('stats'))
 
-db = Database()
+def current_user():
+    """The logged-in user (see user_context.py), loaded once per request; None when logged out"""
+    if 'current_user' not in g:
+        g.current_user = user_context.get(session['user_id']) if 'user_id' in session else None
+    return g.current_user
 
 # Helper function to check if alumni profile is complete
 def check_profile_completion():
@@ -23,15 +74,64 @@ def check_profile_completion():
     if 'user_id' not in session or session.get('role') != 'alumni':
         return True  # Not applicable for non-alumni users
     
-    profile = db.execute_single("""
-        SELECT * FROM alumni_profiles WHERE user_id = ?
-    """, (session['user_id'],))
-    
-    return profile is not None
+    user = current_user()
+    return user is not None and user.has_profile
+
+# Cache tags to drop when a table changes, whichever process or job wrote it
+CHANGE_TAGS = {
+    'events': 'events',
+    'event_registrations': 'registrations',
+    'alumni_profiles': 'profiles',
+    'users': 'users',
+    'announcements': 'announcements',
+    'forum_posts': 'forum',
+    'job_postings': 'jobs',
+    'messages': 'messages',
+}
+
+def invalidate_changed_tables(changes):
+    tags = {CHANGE_TAGS[change['table_name']] for change in changes}
+    for change in changes:
+        if change['table_name'] == 'users':
+            tags.add(UserContext.tag(change['row_id']))
+        elif change['table_name'] == 'alumni_profiles':
+            tags.add(UserContext.tag(change['details']['user_id']))
+    app_cache.invalidate(*tags)
 
-# Initialize database on startup
-with app.app_context():
-    init_database()
+# In-memory stores of this process and the tables they are built from
+LOCAL_STATE_TABLES = ['events', 'event_registrations', 'messages', 'broadcasts', 'broadcast_reads',
+                      'users', 'alumni_profiles', 'forum_posts']
+STATS_TABLES = {'users', 'events', 'event_registrations', 'forum_posts'}
+
+def refresh_local_state(changes):
+    """Bring the live board, unread counts, calendar feeds, dashboard stats and
+    file access cache up to date with writes made elsewhere (other workers,
+    background jobs, the importer). Writes through this process's `db` are
+    skipped: the routes already adjusted these stores when they made them."""
+    tables = {change['table_name'] for change in changes}
+    if tables & {'events', 'event_registrations'}:
+        live_board.invalidate()
+    if 'events' in tables:
+        calendar_feeds.invalidate()
+    
+    unread_users = set()
+    for change in changes:
+        if change['table_name'] == 'event_registrations':
+            calendar_feeds.invalidate(('user', change['details']['user_id']))
+            unread_users.add(change['details']['user_id'])  # broadcasts reach users via registrations
+        elif change['table_name'] == 'messages':
+            unread_users.add(change['details']['recipient_id'])
+        elif change['table_name'] == 'broadcast_reads':
+            unread_users.add(change['details']['user_id'])
+    if 'broadcasts' in tables:
+        unread_counts.invalidate()
+    elif unread_users:
+        unread_counts.invalidate(*unread_users)
+    
+    if tables & STATS_TABLES:
+        dashboard_stats.invalidate()
+    if 'alumni_profiles' in tables:
+        file_access_cache.clear()
 
 # Authentication Routes
 @app.route('/')
@@ -51,7 +151,23 @@ def login():
         
         user = db.execute_single("SELECT * FROM users WHERE email = ?", (email,))
         
-        if user and hashlib.sha256(password.encode('utf-8')).hexdigest() == user['password']:
+        # bcrypt runs on the password pool (see passwords.py); legacy hashes are upgraded here
+        try:
+            if user:
+                valid, needs_rehash = password_hasher.verify(password, user['password'])
+            else:
+                password_hasher.dummy_verify(password)
+                valid = needs_rehash = False
+        except PasswordHasherBusy as e:
+            flash(str(e), 'error')
+            return render_template('login.html'), 503
+        
+        if valid and needs_rehash:
+            upgraded = password_hasher.rehash(password)
+            if upgraded:
+                db.execute_query("UPDATE users SET password = ? WHERE id = ?", (upgraded, user['id']))
+        
+        if valid:
             session['user_id'] = user['id']
             session['email'] = user['email']
             session['role'] = user['role']
@@ -61,10 +177,8 @@ def login():
             if user['role'] == 'admin':
                 return redirect(url_for('admin_dashboard'))
             else:
-                # Check if alumni has completed their profile
-                profile = db.execute_single("""
-                    SELECT * FROM alumni_profiles WHERE user_id = ?
-                """, (user['id'],))
+                # Check if alumni has completed their profile (also warms the user cache)
+                profile = user_context.get(user['id']).profile
                 
                 if not profile:
                     session['profile_incomplete'] = True
@@ -89,13 +203,18 @@ def signup():
             return render_template('signup.html')
         
         # Hash password
-        hashed_password = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        try:
+            hashed_password = password_hasher.hash(password)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'error')
+            return render_template('signup.html'), 503
         
         # Create user
         db.execute_query("""
             INSERT INTO users (email, password, role) 
             VALUES (?, ?, ?)
         """, (email, hashed_password, 'alumni'))
+        dashboard_stats.adjust(total_alumni=1, pending_verification=1)
         
         # Get the new user ID and log them in
         new_user = db.execute_single("SELECT * FROM users WHERE email = ?", (email,))
@@ -123,9 +242,8 @@ def create_profile():
         return redirect(url_for('login'))
     
     # Check if profile already exists
-    existing_profile = db.execute_single("""
-        SELECT * FROM alumni_profiles WHERE user_id = ?
-    """, (session['user_id'],))
+    user = current_user()
+    existing_profile = user.profile if user else None
     
     if existing_profile:
         # Profile already exists, redirect to dashboard
@@ -179,6 +297,7 @@ def create_profile():
                 (user_id, name, batch_year, department, current_job, company, location, linkedin_url, privacy_level)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (session['user_id'], name, batch_year, department, current_job, company, location, linkedin_url, 'public'))
+            profiles_changed(session['user_id'])
             
             # Remove profile incomplete flag
             if 'profile_incomplete' in session:
@@ -202,9 +321,8 @@ def alumni_dashboard():
         return redirect(url_for('login'))
     
     # Check if profile is complete
-    profile = db.execute_single("""
-        SELECT * FROM alumni_profiles WHERE user_id = ?
-    """, (session['user_id'],))
+    user = current_user()
+    profile = user.profile if user else None
     
     if not profile:
         session['profile_incomplete'] = True
@@ -215,8 +333,8 @@ def alumni_dashboard():
         SELECT * FROM events WHERE event_date >= datetime('now') ORDER BY event_date LIMIT 5
     """)
     
-    # Get announcements
-    announcements = db.execute_query("""
+    # Get announcements (only queried when the cached fragment has expired)
+    announcements = Deferred(db.execute_query, """
         SELECT * FROM announcements WHERE is_active = TRUE ORDER BY created_at DESC LIMIT 3
     """)
     
@@ -226,12 +344,9 @@ def alumni_dashboard():
                          announcements=announcements)
 
 # Notifications
-@app.route('/api/notifications')
-def get_notifications():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    # Get notifications for the user
+@app_cache.memoize(ttl=60, tags=['announcements', 'events'])
+def shared_notifications():
+    """Announcement and upcoming-event notifications, the same for every user"""
     notifications = []
     
     # Recent announcements
@@ -288,6 +403,16 @@ def get_notifications():
             'icon': 'fas fa-calendar'
         })
     
+    return notifications
+
+@app.route('/api/notifications')
+def get_notifications():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Get notifications for the user
+    notifications = list(shared_notifications())
+    
     # Recent forum posts (if user is alumni)
     if session.get('role') == 'alumni':
         try:
@@ -323,11 +448,9 @@ def alumni_profile():
         return redirect(url_for('login'))
     
     # Check if profile exists, if not redirect to create profile
-    profile_check = db.execute_single("""
-        SELECT * FROM alumni_profiles WHERE user_id = ?
-    """, (session['user_id'],))
+    user = current_user()
     
-    if not profile_check:
+    if not user or not user.has_profile:
         session['profile_incomplete'] = True
         return redirect(url_for('create_profile'))
     
@@ -343,10 +466,7 @@ def alumni_profile():
         linkedin_url = request.form['linkedin_url']
         privacy_level = request.form['privacy_level']
         
-        # Check if profile exists
-        existing_profile = db.execute_single("""
-            SELECT * FROM alumni_profiles WHERE user_id = ?
-        """, (session['user_id'],))
+        existing_profile = user.profile
         
         if existing_profile:
             # Update existing profile
@@ -367,16 +487,28 @@ def alumni_profile():
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (session['user_id'], name, batch_year, department, current_job,
                   company, location, achievements, linkedin_url, privacy_level))
+        profiles_changed(session['user_id'])
+        
+        # Replace the picture/CV when a new file was chosen
+        for field in PROFILE_FILE_LIMITS:
+            file = request.files.get(field)
+            if not file or not file.filename:
+                continue
+            if not allowed_file(file.filename):
+                flash(f'Unsupported file type for {field.replace("_", " ")}', 'error')
+                continue
+            try:
+                replace_profile_file(session['user_id'], field, file)
+            except FileTooLarge as e:
+                flash(str(e), 'error')
+        
+        file_access_cache.clear()  # privacy level or files may have changed
+        user_context.invalidate(session['user_id'])
         
         flash('Profile updated successfully!', 'success')
         return redirect(url_for('alumni_profile'))
     
-    # Get current profile
-    profile = db.execute_single("""
-        SELECT * FROM alumni_profiles WHERE user_id = ?
-    """, (session['user_id'],))
-    
-    return render_template('alumni/profile.html', profile=profile)
+    return render_template('alumni/profile.html', profile=user.profile)
 
 # Alumni Directory
 @app.route('/alumni/directory')
@@ -418,8 +550,8 @@ def alumni_directory():
     alumni = db.execute_query(query, params)
     
     # Get unique batches and departments for filters
-    batches = db.execute_query("SELECT DISTINCT batch_year FROM alumni_profiles WHERE batch_year IS NOT NULL ORDER BY batch_year DESC")
-    departments = db.execute_query("SELECT DISTINCT department FROM alumni_profiles WHERE department IS NOT NULL ORDER BY department")
+    batches = Deferred(db.execute_query, "SELECT DISTINCT batch_year FROM alumni_profiles WHERE batch_year IS NOT NULL ORDER BY batch_year DESC")
+    departments = Deferred(db.execute_query, "SELECT DISTINCT department FROM alumni_profiles WHERE department IS NOT NULL ORDER BY department")
     
     return render_template('alumni/directory.html', 
                          alumni=alumni, 
@@ -514,8 +646,8 @@ def events():
         ORDER BY e.event_date ASC
     """, (session['user_id'],))
     
-    # Get past events
-    past_events = db.execute_query("""
+    # Get past events (only queried when the cached fragment has expired)
+    past_events = Deferred(db.execute_query, """
         SELECT e.*, COUNT(er.id) as registration_count,
                'past' as event_status
         FROM events e
@@ -550,10 +682,59 @@ def register_event(event_id):
             INSERT INTO event_registrations (event_id, user_id)
             VALUES (?, ?)
         """, (event_id, session['user_id']))
+        live_board.adjust(event_id, registrations=1)
+        calendar_feeds.invalidate(('user', session['user_id']))
+        dashboard_stats.adjust(total_registrations=1)
         flash('Successfully registered for the event!', 'success')
     
     return redirect(url_for('events'))
 
+# Calendar feeds
+def calendar_response(key, name, query, params=()):
+    """Serve a cached iCalendar feed with a strong ETag (304 when unchanged)"""
+    body, etag = calendar_feeds.get(
+        key, lambda: build_calendar(db.execute_query(query, params) or [], name, request.host))
+    
+    response = Response(body, mimetype='text/calendar')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=300' if key[0] == 'user' else 'public, max-age=300'
+    return response.make_conditional(request)
+
+@app.route('/events/calendar.ics')
+def events_calendar():
+    return calendar_response(('public',), 'Alumni Events', """
+        SELECT id, title, description, event_date, location, created_at
+        FROM events
+        WHERE date(event_date) >= date('now', '-90 days')
+        ORDER BY event_date
+    """)
+
+@app.route('/events/calendar/<token>.ics')
+def user_events_calendar(token):
+    try:
+        user_id = calendar_signer.loads(token)
+    except BadSignature:
+        abort(404)
+    
+    return calendar_response(('user', user_id), 'My Alumni Events', """
+        SELECT e.id, e.title, e.description, e.event_date, e.location, e.created_at
+        FROM event_registrations er
+        JOIN events e ON er.event_id = e.id
+        WHERE er.user_id = ? AND er.status != 'rejected'
+        ORDER BY e.event_date
+    """, (user_id,))
+
+@app.route('/api/calendar/subscribe')
+def calendar_subscribe_links():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'success': True,
+        'public_feed': url_for('events_calendar', _external=True),
+        'my_feed': url_for('user_events_calendar', token=calendar_signer.dumps(session['user_id']), _external=True)
+    })
+
 # Job Board
 @app.route('/jobs')
 def job_board():
@@ -628,15 +809,8 @@ def admin_dashboard():
     if 'user_id' not in session or session.get('role') != 'admin':
         return redirect(url_for('login'))
     
-    # Get statistics
-    stats = {
-        'total_alumni': db.execute_single("SELECT COUNT(*) as count FROM users WHERE role = 'alumni'")['count'],
-        'verified_alumni': db.execute_single("SELECT COUNT(*) as count FROM users WHERE role = 'alumni' AND is_verified = TRUE")['count'],
-        'pending_verification': db.execute_single("SELECT COUNT(*) as count FROM users WHERE role = 'alumni' AND is_verified = FALSE")['count'],
-        'total_events': db.execute_single("SELECT COUNT(*) as count FROM events")['count'],
-
-        'total_posts': db.execute_single("SELECT COUNT(*) as count FROM forum_posts")['count']
-    }
+    # Get statistics (one cached query, see stats.py; skipped while the cards are cached)
+    stats = Deferred(dashboard_stats.snapshot)
     
     # Get recent registrations
     recent_alumni = db.execute_query("""
@@ -650,12 +824,70 @@ def admin_dashboard():
     
     return render_template('admin/dashboard.html', stats=stats, recent_alumni=recent_alumni)
 
+@app.route('/admin/metrics')
+def admin_metrics():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({'success': True, 'metrics': metrics.snapshot()})
+
+@app.route('/admin/changes')
+def admin_changes():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    since = request.args.get('since', 0, type=int)
+    tables = [table for table in request.args.get('tables', '').split(',') if table]
+    changes = change_feed.changes_since(since, tables or None, limit=request.args.get('limit', 100, type=int))
+    return jsonify({
+        'success': True,
+        'changes': changes,
+        'next': changes[-1]['seq'] if changes else since
+    })
+
+@app.route('/admin/analytics/series')
+def admin_analytics_series():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    metrics = [m for m in request.args.get('metrics', ','.join(analytics.METRICS)).split(',') if m]
+    bucket = request.args.get('bucket', 'day')
+    unknown = [m for m in metrics if m not in analytics.METRICS]
+    if unknown or bucket not in analytics.BUCKETS:
+        return jsonify({'success': False, 'message': f"Unknown metric or bucket: {', '.join(unknown) or bucket}"}), 400
+    
+    try:
+        end = datetime.fromisoformat(request.args['end']) if request.args.get('end') else datetime.utcnow()
+        if request.args.get('start'):
+            start = datetime.fromisoformat(request.args['start'])
+        else:
+            start = end - timedelta(days=request.args.get('days', 30, type=int) - 1)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'start and end must be ISO dates'}), 400
+    
+    step = analytics.BUCKETS[bucket][2]
+    if (end - start) / step >= Config.ANALYTICS_MAX_POINTS:
+        return jsonify({'success': False, 'message': f'Range exceeds {Config.ANALYTICS_MAX_POINTS} points'}), 400
+    
+    labels, series = analytics.series(db, metrics, bucket, start, end)
+    return jsonify({'success': True, 'bucket': bucket, 'labels': labels, 'series': series})
+
+@app.route('/admin/analytics/rebuild', methods=['POST'])
+def admin_analytics_rebuild():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    job_id = enqueue_job('analytics_rebuild', {})
+    return jsonify({'success': True, 'job_id': job_id, 'status_url': url_for('admin_job_status', job_id=job_id)})
+
 @app.route('/admin/verify_alumni/<int:user_id>')
 def verify_alumni(user_id):
     if 'user_id' not in session or session.get('role') != 'admin':
         return redirect(url_for('login'))
     
     db.execute_query("UPDATE users SET is_verified = TRUE WHERE id = ?", (user_id,))
+    dashboard_stats.invalidate()
+    user_context.invalidate(user_id)
     flash('Alumni verified successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
 
@@ -677,8 +909,8 @@ def admin_add_alumni():
         if existing_user:
             return jsonify({'success': False, 'message': 'Email already registered'})
         
-        # Hash password
-        hashed_password = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        # Hash password (PasswordHasherBusy is reported like any other failure)
+        hashed_password = password_hasher.hash(password)
         
         # Create user
         db.execute_query("""
@@ -694,12 +926,53 @@ def admin_add_alumni():
             INSERT INTO alumni_profiles (user_id, name, batch_year, department)
             VALUES (?, ?, ?, ?)
         """, (user_id, name, batch_year, department))
+        profiles_changed()
+        
+        if auto_verify:
+            dashboard_stats.adjust(total_alumni=1, verified_alumni=1)
+        else:
+            dashboard_stats.adjust(total_alumni=1, pending_verification=1)
         
         return jsonify({'success': True, 'message': 'Alumni added successfully'})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/admin/alumni/import', methods=['POST'])
+def admin_import_alumni():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        file = request.files.get('file')
+        if not file or not file.filename.lower().endswith('.csv'):
+            return jsonify({'success': False, 'message': 'Please upload a CSV file'})
+        
+        header = file.stream.readline().decode('utf-8-sig', errors='replace')
+        missing = missing_columns(next(csv.reader([header]), []))
+        if missing:
+            return jsonify({'success': False, 'message': f"Missing required columns: {', '.join(missing)}"})
+        file.stream.seek(0)
+        
+        # The import runs as a background job; rows are read back from this copy
+        import_folder = os.path.join(app.config['UPLOAD_FOLDER'], 'imports')
+        os.makedirs(import_folder, exist_ok=True)
+        path = os.path.abspath(os.path.join(import_folder, f'{uuid.uuid4().hex}.csv'))
+        file.save(path)
+        
+        default_password = request.form.get('default_password')
+        job_id = enqueue_job('alumni_import', {
+            'path': path,
+            'auto_verify': 'auto_verify' in request.form,
+            'default_password_hash': password_hasher.hash(default_password) if default_password else None
+        })
+        
+        return jsonify({'success': True, 'message': 'Import started', 'job_id': job_id,
+                        'status_url': url_for('admin_job_status', job_id=job_id)})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
 @app.route('/admin/remove_alumni/<int:user_id>', methods=['DELETE'])
 def admin_remove_alumni(user_id):
     if 'user_id' not in session or session.get('role') != 'admin':
@@ -711,6 +984,8 @@ def admin_remove_alumni(user_id):
         
         # Delete user
         db.execute_query("DELETE FROM users WHERE id = ? AND role = 'alumni'", (user_id,))
+        dashboard_stats.invalidate()
+        profiles_changed(user_id)
         
         return jsonify({'success': True, 'message': 'Alumni removed successfully'})
         
@@ -718,6 +993,21 @@ def admin_remove_alumni(user_id):
         return jsonify({'success': False, 'message': str(e)})
 
 # File Upload Handler
+PROFILE_FILE_LIMITS = {'profile_picture': Config.MAX_PROFILE_PICTURE_SIZE, 'cv_file': Config.MAX_CV_SIZE}
+
+def replace_profile_file(user_id, field, file):
+    """Store an upload as the user's profile picture or CV and release the file it replaces"""
+    # Stored by content hash; uploading the same file again reuses the stored copy
+    stored = file_store.put(file.stream, secure_filename(file.filename), max_size=PROFILE_FILE_LIMITS[field])
+    previous = db.execute_single(f"SELECT {field} FROM alumni_profiles WHERE user_id = ?", (user_id,))
+    if previous is None:
+        file_store.release(stored)  # no profile to hold the reference
+        return None
+    db.execute_query(f"UPDATE alumni_profiles SET {field} = ? WHERE user_id = ?", (stored, user_id))
+    if previous[field]:
+        file_store.release(previous[field])
+    return stored
+
 @app.route('/upload_file', methods=['POST'])
 def upload_file():
     if 'user_id' not in session:
@@ -730,19 +1020,81 @@ def upload_file():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     
+    field = request.form.get('field', 'cv_file')
+    if field not in PROFILE_FILE_LIMITS:
+        return jsonify({'error': 'Invalid field'}), 400
+    
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        # Add timestamp to avoid conflicts
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-        filename = timestamp + filename
-        
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        try:
+            filename = replace_profile_file(session['user_id'], field, file)
+        except FileTooLarge as e:
+            return jsonify({'error': str(e)}), 413
+        if filename is None:
+            return jsonify({'error': 'Create your profile first'}), 400
+        file_access_cache.clear()
+        user_context.invalidate(session['user_id'])
         
         return jsonify({'success': True, 'filename': filename})
     
     return jsonify({'error': 'Invalid file type'}), 400
 
+def file_access(name):
+    """(owners, stored file row) for an uploaded file name, cached briefly.
+    
+    owners is a list of (user_id, privacy_level) for profiles using the file.
+    """
+    access = file_access_cache.get(name)
+    if access is None:
+        owners = [(row['user_id'], row['privacy_level']) for row in db.execute_query("""
+            SELECT user_id, privacy_level FROM alumni_profiles
+            WHERE profile_picture = ? OR cv_file = ?
+        """, (name, name)) or []]
+        access = (owners, file_store.info(name) if is_content_addressed(name) else None)
+        file_access_cache.set(name, access)
+    return access
+
+def can_view_file(owners):
+    """Public profiles' files are visible to any member; private ones, like the
+    profiles themselves in the directory, only to the owner and admins;
+    unreferenced files to admins only"""
+    if session.get('role') == 'admin':
+        return True
+    if not owners:
+        return False
+    if any(privacy == 'public' for _, privacy in owners):
+        return True
+    return any(user_id == session['user_id'] for user_id, _ in owners)
+
+@app.route('/files/<name>')
+def serve_file(name):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    owners, stored = file_access(name)
+    if not can_view_file(owners):
+        abort(404)  # Don't reveal that a private file exists
+    
+    if stored is None:
+        # Files uploaded before content addressing: revalidate instead of caching forever
+        response = send_from_directory(os.path.abspath(app.config['UPLOAD_FOLDER']), secure_filename(name),
+                                       conditional=True, max_age=300)
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+    
+    digest, _ = split_name(name)
+    path = file_store.backend.local_path(digest)
+    # send_file answers Range and If-None-Match/If-Modified-Since itself and
+    # hands local files to the server's wsgi.file_wrapper (sendfile)
+    response = send_file(path or file_store.backend.open(digest), mimetype=stored['content_type'],
+                         conditional=True, etag=digest, max_age=Config.FILE_MAX_AGE,
+                         last_modified=stored['created_at'])
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
 # API Routes for AJAX
 @app.route('/api/sync_linkedin', methods=['POST'])
 def sync_linkedin():
@@ -762,6 +1114,7 @@ def sync_linkedin():
         WHERE user_id = ?
     """, (dummy_data['current_job'], dummy_data['company'], 
           dummy_data['location'], session['user_id']))
+    user_context.invalidate(session['user_id'])
     
     return jsonify({'success': True, 'data': dummy_data})
 
@@ -797,58 +1150,201 @@ def messages():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    # Get inbox messages
-    inbox_messages = db.execute_query("""
-        SELECT m.*, ap.name as sender_name
-        FROM messages m
-        LEFT JOIN alumni_profiles ap ON m.sender_id = ap.user_id
-        WHERE m.recipient_id = ?
-        ORDER BY m.created_at DESC
-    """, (session['user_id'],))
-    
-    # Get sent messages
-    sent_messages = db.execute_query("""
-        SELECT m.*, ap.name as recipient_name
-        FROM messages m
-        LEFT JOIN alumni_profiles ap ON m.recipient_id = ap.user_id
-        WHERE m.sender_id = ?
-        ORDER BY m.created_at DESC
-    """, (session['user_id'],))
+    # First page of each folder; older pages load from the JSON endpoints
+    inbox_messages, inbox_cursor = message_page('inbox', session['user_id'])
+    sent_messages, sent_cursor = message_page('sent', session['user_id'])
     
     # Get unread count
-    unread_count = db.execute_single("""
-        SELECT COUNT(*) as count FROM messages 
-        WHERE recipient_id = ? AND is_read = FALSE
-    """, (session['user_id'],))['count']
+    unread_count = unread_counts.get(session['user_id'])
     
-    # Get available users for compose
-    if session.get('role') == 'admin':
-        available_users = db.execute_query("""
+    # Compose recipients come from /api/messages/recipients as the user types
+    return render_template('messages/inbox.html',
+                         inbox_messages=inbox_messages,
+                         inbox_cursor=inbox_cursor,
+                         sent_messages=sent_messages,
+                         sent_cursor=sent_cursor,
+                         unread_count=unread_count)
+
+def search_recipients(prefix, include_admins, limit):
+    """Verified alumni (and optionally admins) whose name or email starts with `prefix`.
+    
+    `prefix` must already be lower-cased; the range conditions are served by
+    the lower(name) / lower(email) expression indexes.
+    """
+    upper = prefix + '\uffff'
+    # Each branch walks its index in order and stops at `limit`
+    query = """
+        SELECT * FROM (
             SELECT ap.user_id, ap.name, u.email
             FROM alumni_profiles ap
             JOIN users u ON ap.user_id = u.id
-            WHERE u.is_verified = TRUE AND u.id != ?
-            ORDER BY ap.name
-        """, (session['user_id'],))
-    else:
-        # Alumni can message other alumni and admins
-        available_users = db.execute_query("""
+            WHERE u.is_verified = TRUE AND lower(ap.name) >= ? AND lower(ap.name) < ?
+            ORDER BY lower(ap.name) LIMIT ?
+        )
+        UNION
+        SELECT * FROM (
             SELECT ap.user_id, ap.name, u.email
-            FROM alumni_profiles ap
-            JOIN users u ON ap.user_id = u.id
-            WHERE u.is_verified = TRUE AND u.id != ?
-            UNION
+            FROM users u
+            JOIN alumni_profiles ap ON ap.user_id = u.id
+            WHERE u.is_verified = TRUE AND lower(u.email) >= ? AND lower(u.email) < ?
+            ORDER BY lower(u.email) LIMIT ?
+        )
+    """
+    params = [prefix, upper, limit, prefix, upper, limit]
+    
+    if include_admins:
+        # Alumni can message other alumni and admins
+        query += """
+        UNION
+        SELECT * FROM (
             SELECT u.id as user_id, u.email as name, u.email
             FROM users u
-            WHERE u.role = 'admin' AND u.id != ?
-            ORDER BY name
-        """, (session['user_id'], session['user_id']))
+            WHERE u.role = 'admin' AND lower(u.email) >= ? AND lower(u.email) < ?
+            ORDER BY lower(u.email) LIMIT ?
+        )
+        """
+        params.extend([prefix, upper, limit])
     
-    return render_template('messages/inbox.html',
-                         inbox_messages=inbox_messages,
-                         sent_messages=sent_messages,
-                         unread_count=unread_count,
-                         available_users=available_users)
+    query += " ORDER BY name LIMIT ?"
+    params.append(limit)
+    return db.execute_query(query, params) or []
+
+@app.route('/api/messages/recipients')
+def recipient_typeahead():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    prefix = request.args.get('q', '').strip().lower()
+    if len(prefix) < Config.RECIPIENT_SEARCH_MIN_CHARS:
+        return jsonify({'success': True, 'recipients': []})
+    
+    limit = max(1, min(request.args.get('limit', 10, type=int), Config.RECIPIENT_SEARCH_MAX_RESULTS))
+    include_admins = session.get('role') != 'admin'
+    
+    # Results are shared by every user with the same role; only the
+    # current user is filtered out per request
+    cache_key = (include_admins, prefix)
+    results = recipient_cache.get(cache_key)
+    if results is None:
+        results = search_recipients(prefix, include_admins, Config.RECIPIENT_SEARCH_MAX_RESULTS + 1)
+        recipient_cache.set(cache_key, results)
+    
+    recipients = [r for r in results if r['user_id'] != session['user_id']][:limit]
+    return jsonify({'success': True, 'recipients': recipients})
+
+# Message list queries: previews only, bodies load through /api/messages/<id>
+MESSAGE_FOLDERS = {
+    'inbox': ("m.recipient_id = ?", "m.sender_id", "sender_name"),
+    'sent': ("m.sender_id = ?", "m.recipient_id", "recipient_name"),
+    'conversation': ("m.conversation_id = ?", "m.sender_id", "sender_name"),
+}
+
+def message_page(folder, key, cursor=None, limit=None):
+    """Return (messages, next_cursor) for one page of a folder, newest first.
+    
+    Pages are keyed on (created_at, id) so each one is a range scan over the
+    matching messages index, however deep the user pages.
+    """
+    where, other_party, name_column = MESSAGE_FOLDERS[folder]
+    limit = limit or Config.MESSAGES_PAGE_SIZE
+    query = f"""
+        SELECT m.id, m.sender_id, m.recipient_id, m.subject, m.is_read, m.created_at,
+               m.conversation_id, substr(m.content, 1, 100) as content, ap.name as {name_column}
+        FROM messages m
+        LEFT JOIN alumni_profiles ap ON {other_party} = ap.user_id
+        WHERE {where}
+    """
+    params = [key]
+    
+    if cursor:
+        created_at, message_id = cursor.rsplit('|', 1)
+        query += " AND (m.created_at < ? OR (m.created_at = ? AND m.id < ?))"
+        params.extend([created_at, created_at, int(message_id)])
+    
+    query += " ORDER BY m.created_at DESC, m.id DESC LIMIT ?"
+    params.append(limit + 1)
+    
+    rows = db.execute_query(query, params) or []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1]['created_at']}|{rows[-1]['id']}"
+    return rows, next_cursor
+
+@app.route('/api/messages/folder/<folder>')
+def get_message_folder(folder):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    if folder not in ('inbox', 'sent'):
+        return jsonify({'error': 'Unknown folder'}), 404
+    
+    try:
+        limit = min(int(request.args.get('limit', Config.MESSAGES_PAGE_SIZE)), 100)
+        messages, next_cursor = message_page(folder, session['user_id'], request.args.get('cursor'), limit)
+        return jsonify({'success': True, 'messages': messages, 'next_cursor': next_cursor})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/messages/conversations')
+def get_conversations():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        limit = min(int(request.args.get('limit', Config.MESSAGES_PAGE_SIZE)), 100)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        
+        # Latest message per conversation the user takes part in
+        conversations = db.execute_query("""
+            SELECT m.conversation_id, m.id as last_message_id, m.subject, m.created_at,
+                   substr(m.content, 1, 100) as content,
+                   CASE WHEN m.sender_id = ? THEN m.recipient_id ELSE m.sender_id END as other_user_id,
+                   ap.name as other_name,
+                   (SELECT COUNT(*) FROM messages u
+                    WHERE u.conversation_id = m.conversation_id
+                      AND u.recipient_id = ? AND u.is_read = FALSE) as unread_count
+            FROM messages m
+            LEFT JOIN alumni_profiles ap
+                   ON ap.user_id = CASE WHEN m.sender_id = ? THEN m.recipient_id ELSE m.sender_id END
+            WHERE m.id IN (
+                SELECT MAX(id) FROM (
+                    SELECT id, conversation_id FROM messages WHERE recipient_id = ?
+                    UNION ALL
+                    SELECT id, conversation_id FROM messages WHERE sender_id = ?
+                ) GROUP BY conversation_id
+            )
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT ? OFFSET ?
+        """, (session['user_id'],) * 5 + (limit + 1, offset)) or []
+        
+        has_more = len(conversations) > limit
+        return jsonify({
+            'success': True,
+            'conversations': conversations[:limit],
+            'next_offset': offset + limit if has_more else None
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/messages/conversations/<conversation_id>')
+def get_conversation(conversation_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Conversation ids are "<lower user id>:<higher user id>"
+    if str(session['user_id']) not in conversation_id.split(':'):
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    try:
+        limit = min(int(request.args.get('limit', Config.MESSAGES_PAGE_SIZE)), 100)
+        messages, next_cursor = message_page('conversation', conversation_id, request.args.get('cursor'), limit)
+        return jsonify({'success': True, 'messages': messages, 'next_cursor': next_cursor})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
 
 @app.route('/send_message', methods=['POST'])
 def send_message():
@@ -861,9 +1357,11 @@ def send_message():
         content = request.form['content']
         
         db.execute_query("""
-            INSERT INTO messages (sender_id, recipient_id, subject, content)
-            VALUES (?, ?, ?, ?)
-        """, (session['user_id'], recipient_id, subject, content))
+            INSERT INTO messages (sender_id, recipient_id, subject, content, conversation_id)
+            VALUES (?, ?, ?, ?, ?)
+        """, (session['user_id'], recipient_id, subject, content,
+              conversation_key(session['user_id'], recipient_id)))
+        unread_counts.publish([int(recipient_id)], 1)
         
         return jsonify({'success': True, 'message': 'Message sent successfully'})
         
@@ -896,6 +1394,7 @@ def mark_message_read(message_id):
         UPDATE messages SET is_read = TRUE 
         WHERE id = ? AND recipient_id = ?
     """, (message_id, session['user_id']))
+    unread_counts.publish([session['user_id']])
     
     return jsonify({'success': True})
 
@@ -904,11 +1403,19 @@ def delete_message(message_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
     
+    message = db.execute_single("""
+        SELECT recipient_id FROM messages
+        WHERE id = ? AND (sender_id = ? OR recipient_id = ?)
+    """, (message_id, session['user_id'], session['user_id']))
+    
     db.execute_query("""
         DELETE FROM messages 
         WHERE id = ? AND (sender_id = ? OR recipient_id = ?)
     """, (message_id, session['user_id'], session['user_id']))
     
+    if message:
+        unread_counts.publish([message['recipient_id']])
+    
     return jsonify({'success': True})
 
 @app.route('/api/message_count')
@@ -916,12 +1423,73 @@ def get_message_count():
     if 'user_id' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    unread_count = db.execute_single("""
-        SELECT COUNT(*) as count FROM messages 
-        WHERE recipient_id = ? AND is_read = FALSE
-    """, (session['user_id'],))['count']
+    return jsonify({'count': unread_counts.get(session['user_id'])})
+
+@app.route('/api/message_count/stream')
+def stream_message_count():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return stream_slots.response(unread_counts.stream(session['user_id']))
+
+@app.route('/api/broadcasts')
+def get_broadcasts():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
     
-    return jsonify({'count': unread_count})
+    try:
+        limit = min(int(request.args.get('limit', Config.MESSAGES_PAGE_SIZE)), 100)
+        before = request.args.get('before')
+        
+        # Shared broadcasts reach the user through their event registrations
+        query = f"""
+            SELECT b.id, b.event_id, b.subject, substr(b.content, 1, 100) as content, b.created_at,
+                   e.title as event_title, br.broadcast_id IS NOT NULL as is_read
+            FROM broadcasts b
+            JOIN events e ON e.id = b.event_id
+            LEFT JOIN broadcast_reads br ON br.broadcast_id = b.id AND br.user_id = ?
+            WHERE {BROADCAST_RECIPIENT_SQL}
+        """
+        params = [session['user_id'], session['user_id']]
+        if before:
+            query += " AND b.id < ?"
+            params.append(int(before))
+        query += " ORDER BY b.id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        broadcasts = db.execute_query(query, params) or []
+        has_more = len(broadcasts) > limit
+        broadcasts = broadcasts[:limit]
+        return jsonify({
+            'success': True,
+            'broadcasts': broadcasts,
+            'next_before': broadcasts[-1]['id'] if has_more else None
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/broadcasts/<int:broadcast_id>')
+def get_broadcast(broadcast_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    broadcast = db.execute_single(f"""
+        SELECT b.*, e.title as event_title
+        FROM broadcasts b
+        JOIN events e ON e.id = b.event_id
+        WHERE b.id = ? AND {BROADCAST_RECIPIENT_SQL}
+    """, (broadcast_id, session['user_id']))
+    
+    if not broadcast:
+        return jsonify({'error': 'Broadcast not found'}), 404
+    
+    db.execute_query("""
+        INSERT OR IGNORE INTO broadcast_reads (broadcast_id, user_id) VALUES (?, ?)
+    """, (broadcast_id, session['user_id']))
+    unread_counts.publish([session['user_id']])
+    
+    return jsonify({'success': True, 'broadcast': broadcast})
 
 # Admin Event Management Routes
 @app.route('/admin/events')
@@ -982,7 +1550,7 @@ def admin_events():
         # Statistics
         stats = {
             'total_events': len(all_events),
-            'total_registrations': db.execute_single("SELECT COUNT(*) as count FROM event_registrations")['count'] or 0,
+            'total_registrations': dashboard_stats.snapshot()['total_registrations'],
             'ongoing_count': len(ongoing_events),
             'upcoming_count': len(upcoming_events),
         }
@@ -1076,6 +1644,10 @@ def admin_approve_registration(registration_id):
         db.execute_query("""
             UPDATE event_registrations SET status = 'approved' WHERE id = ?
         """, (registration_id,))
+        registration = db.execute_single("SELECT user_id FROM event_registrations WHERE id = ?",
+                                         (registration_id,))
+        if registration:
+            calendar_feeds.invalidate(('user', registration['user_id']))
         
         return jsonify({'success': True, 'message': 'Registration approved'})
         
@@ -1095,6 +1667,7 @@ def admin_edit_registration(registration_id):
         db.execute_query("""
             UPDATE event_registrations SET status = ?, admin_notes = ? WHERE id = ?
         """, (status, notes, registration_id))
+        calendar_feeds.invalidate()
         
         return jsonify({'success': True, 'message': 'Registration updated'})
         
@@ -1118,6 +1691,10 @@ def admin_bulk_approve_registrations():
             UPDATE event_registrations SET status = 'approved' 
             WHERE id IN ({placeholders})
         """, registration_ids)
+        for row in db.execute_query(f"""
+            SELECT DISTINCT user_id FROM event_registrations WHERE id IN ({placeholders})
+        """, registration_ids) or []:
+            calendar_feeds.invalidate(('user', row['user_id']))
         
         return jsonify({
             'success': True, 
@@ -1140,8 +1717,20 @@ def admin_bulk_remove_registrations():
             return jsonify({'success': False, 'message': 'No registrations selected'})
         
         placeholders = ','.join(['?' for _ in registration_ids])
+        removed = db.execute_query(f"""
+            SELECT event_id, COUNT(*) as count,
+                   COUNT(CASE WHEN attended = 1 THEN 1 END) as attended
+            FROM event_registrations WHERE id IN ({placeholders})
+            GROUP BY event_id
+        """, registration_ids) or []
         db.execute_query(f"DELETE FROM event_registrations WHERE id IN ({placeholders})", registration_ids)
         
+        for row in removed:
+            live_board.adjust(row['event_id'], registrations=-row['count'], attended=-row['attended'])
+        calendar_feeds.invalidate()
+        dashboard_stats.adjust(total_registrations=-sum(row['count'] for row in removed))
+        app_cache.invalidate('registrations')
+        
         return jsonify({
             'success': True, 
             'message': f'{len(registration_ids)} registrations removed'
@@ -1161,6 +1750,7 @@ def admin_delete_event(event_id):
         
         # Delete event
         db.execute_query("DELETE FROM events WHERE id = ?", (event_id,))
+        events_changed()
         
         return jsonify({'success': True, 'message': 'Event deleted successfully'})
         
@@ -1178,12 +1768,47 @@ def admin_send_reminders(event_id):
             SELECT COUNT(*) as count FROM event_registrations WHERE event_id = ?
         """, (event_id,))['count']
         
-        # Simulate sending reminders (in real app, would send actual emails)
-        return jsonify({'success': True, 'message': 'Reminders sent successfully', 'count': count})
+        job_id = enqueue_job('event_reminders', {'event_ids': [event_id]})
+        return jsonify({'success': True, 'message': 'Reminders are being sent', 'count': count,
+                        'job_id': job_id, 'status_url': url_for('admin_job_status', job_id=job_id)})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+def enqueue_job(kind, payload):
+    """Queue background work for the current admin; repeated requests carrying
+    the same Idempotency-Key header reuse the original job"""
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key:
+        idempotency_key = f"{kind}:{session['user_id']}:{idempotency_key}"
+    return job_queue.enqueue(kind, payload, idempotency_key=idempotency_key, created_by=session['user_id'])
+
+@app.route('/admin/jobs/<int:job_id>')
+def admin_job_status(job_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    job = job_queue.status(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    
+    return jsonify({
+        'success': True,
+        'job': {
+            'id': job['id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'progress': job['progress'],
+            'total': job['total'],
+            'attempts': job['attempts'],
+            'max_attempts': job['max_attempts'],
+            'result': job['result'],
+            'last_error': job['last_error'],
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at']
+        }
+    })
+
 
 
 @app.route('/admin/events/registration/<int:registration_id>/remove', methods=['DELETE'])
@@ -1192,14 +1817,51 @@ def admin_remove_registration(registration_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
+        registration = db.execute_single("""
+            SELECT event_id, user_id, attended FROM event_registrations WHERE id = ?
+        """, (registration_id,))
+        
         # Remove the registration
         db.execute_query("DELETE FROM event_registrations WHERE id = ?", (registration_id,))
         
+        if registration:
+            live_board.adjust(registration['event_id'], registrations=-1,
+                              attended=-1 if registration['attended'] else 0)
+            calendar_feeds.invalidate(('user', registration['user_id']))
+            dashboard_stats.adjust(total_registrations=-1)
+            app_cache.invalidate('registrations')
+        
         return jsonify({'success': True, 'message': 'Registration removed successfully'})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/admin/events/registration/<int:registration_id>/check-in', methods=['POST'])
+def admin_check_in_registration(registration_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        attended = 1 if data.get('attended', True) else 0
+        
+        registration = db.execute_single("""
+            SELECT event_id, attended FROM event_registrations WHERE id = ?
+        """, (registration_id,))
+        if not registration:
+            return jsonify({'success': False, 'message': 'Registration not found'})
+        
+        if (registration['attended'] or 0) != attended:
+            db.execute_query("""
+                UPDATE event_registrations SET attended = ? WHERE id = ?
+            """, (attended, registration_id))
+            live_board.adjust(registration['event_id'], attended=1 if attended else -1)
+        
+        return jsonify({'success': True, 'message': 'Check-in recorded' if attended else 'Check-in cleared'})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
 @app.route('/admin/events/registration/<int:registration_id>/remind', methods=['POST'])
 def admin_remind_registration(registration_id):
     if 'user_id' not in session or session.get('role') != 'admin':
@@ -1208,22 +1870,15 @@ def admin_remind_registration(registration_id):
     try:
         # Get registration details
         registration = db.execute_single("""
-            SELECT er.*, e.title as event_title, e.event_date, ap.name, u.email
-            FROM event_registrations er
-            JOIN events e ON er.event_id = e.id
-            JOIN alumni_profiles ap ON er.user_id = ap.user_id
-            JOIN users u ON er.user_id = u.id
-            WHERE er.id = ?
+            SELECT id FROM event_registrations WHERE id = ?
         """, (registration_id,))
         
         if not registration:
             return jsonify({'success': False, 'message': 'Registration not found'})
         
-        # In a real application, you would send an email here
-        # For now, we'll just simulate the reminder
-        print(f"Reminder sent to {registration['email']} for event: {registration['event_title']}")
-        
-        return jsonify({'success': True, 'message': 'Reminder sent successfully'})
+        job_id = enqueue_job('registration_reminders', {'registration_ids': [registration_id]})
+        return jsonify({'success': True, 'message': 'Reminder queued', 'job_id': job_id,
+                        'status_url': url_for('admin_job_status', job_id=job_id)})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
@@ -1240,25 +1895,13 @@ def admin_bulk_remind_registrations():
         if not registration_ids:
             return jsonify({'success': False, 'message': 'No registrations selected'})
         
-        # Get registration details
-        placeholders = ','.join(['?' for _ in registration_ids])
-        registrations = db.execute_query(f"""
-            SELECT er.*, e.title as event_title, e.event_date, ap.name, u.email
-            FROM event_registrations er
-            JOIN events e ON er.event_id = e.id
-            JOIN alumni_profiles ap ON er.user_id = ap.user_id
-            JOIN users u ON er.user_id = u.id
-            WHERE er.id IN ({placeholders})
-        """, registration_ids)
-        
-        # In a real application, you would send emails here
-        # For now, we'll just simulate the reminders
-        for registration in registrations:
-            print(f"Reminder sent to {registration['email']} for event: {registration['event_title']}")
+        job_id = enqueue_job('registration_reminders', {'registration_ids': registration_ids})
         
         return jsonify({
             'success': True, 
-            'message': f'Reminders sent to {len(registrations)} alumni'
+            'message': f'Reminders queued for {len(registration_ids)} alumni',
+            'job_id': job_id,
+            'status_url': url_for('admin_job_status', job_id=job_id)
         })
         
     except Exception as e:
@@ -1354,22 +1997,102 @@ def admin_create_event():
         require_approval = 'require_approval' in request.form
         send_notifications = 'send_notifications' in request.form
         
+        repeat = request.form.get('repeat', 'none')
+        
         # Convert capacity to int if provided
         capacity_value = int(capacity) if capacity and capacity.strip() else None
         
-        db.execute_query("""
-            INSERT INTO events (title, description, event_date, location, capacity, event_type, 
-                              require_approval, created_by)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (title, description, event_date, location, capacity_value, event_type, 
-              require_approval, session['user_id']))
+        if repeat in FREQUENCIES:
+            interval = int(request.form.get('repeat_interval') or 1)
+            until = request.form.get('repeat_until', '').strip() or None
+            count = request.form.get('repeat_count', '').strip()
+            if not until and not count:
+                return jsonify({'success': False,
+                                'message': 'A repeating event needs an end date or a number of occurrences'})
+            created_count, new_event_id = create_event_series(title, description, event_date, location,
+                                                              capacity_value, event_type, require_approval, repeat,
+                                                              interval, until, int(count) if count else None)
+            message = f'Event series created with {created_count} occurrences'
+        else:
+            new_event_id = db.execute_insert("""
+                INSERT INTO events (title, description, event_date, location, capacity, event_type, 
+                                  require_approval, created_by)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (title, description, event_date, location, capacity_value, event_type, 
+                  require_approval, session['user_id']))
+            message = 'Event created successfully'
+        events_changed()
         
         # Send notifications if requested
-        if send_notifications:
-            # In a real app, this would send actual notifications
-            pass
+        if send_notifications and new_event_id:
+            enqueue_job('new_event_notifications', {'event_id': new_event_id})
+        
+        return jsonify({'success': True, 'message': message})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+def create_event_series(title, description, event_date, location, capacity, event_type,
+                        require_approval, freq, interval, until, count):
+    """Create a recurring series ending on `until` or after `count` occurrences
+    and materialize its occurrences in one batched insert"""
+    start = parse_event_datetime(event_date)
+    until_date = parse_event_datetime(until).replace(hour=23, minute=59, second=59) if until else None
+    dates = list(occurrences(start, freq, interval, until=until_date, count=count,
+                             limit=Config.MAX_SERIES_OCCURRENCES + 1))
+    if len(dates) > Config.MAX_SERIES_OCCURRENCES:
+        raise ValueError(f'A series can have at most {Config.MAX_SERIES_OCCURRENCES} occurrences')
+    
+    series_id = db.execute_insert("""
+        INSERT INTO event_series (title, description, location, capacity, event_type, require_approval,
+                                  freq, interval, start_date, until_date, occurrence_count, created_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (title, description, location, capacity, event_type, require_approval, freq, interval,
+          start.strftime('%Y-%m-%d %H:%M:%S'),
+          until_date.strftime('%Y-%m-%d %H:%M:%S') if until_date else None,
+          count, session['user_id']))
+    
+    rows = [
+        (title, description, occurrence.strftime('%Y-%m-%d %H:%M:%S'), location, capacity, event_type,
+         require_approval, session['user_id'], series_id)
+        for occurrence in dates
+    ]
+    db.execute_many("""
+        INSERT INTO events (title, description, event_date, location, capacity, event_type,
+                          require_approval, created_by, series_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    
+    first = db.execute_single("""
+        SELECT id FROM events WHERE series_id = ? ORDER BY event_date LIMIT 1
+    """, (series_id,))
+    return len(rows), first['id'] if first else None
+
+@app.route('/admin/events/series/<int:series_id>/occurrences')
+def admin_series_occurrences(series_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        series = db.execute_single("SELECT * FROM event_series WHERE id = ?", (series_id,))
+        if not series:
+            return jsonify({'success': False, 'message': 'Series not found'})
+        
+        # Expand the rule lazily for the requested window only
+        window_start = parse_event_datetime(request.args.get('start') or datetime.now().strftime('%Y-%m-%d'))
+        window_end = (parse_event_datetime(request.args['end']) if request.args.get('end')
+                      else window_start + timedelta(days=31))
+        
+        dates = occurrences_between(series['start_date'], series['freq'], window_start, window_end,
+                                    interval=series['interval'] or 1, until=series['until_date'],
+                                    count=series['occurrence_count'])
         
-        return jsonify({'success': True, 'message': 'Event created successfully'})
+        return jsonify({
+            'success': True,
+            'series_id': series_id,
+            'title': series['title'],
+            'occurrences': [d.strftime('%Y-%m-%dT%H:%M') for d in dates]
+        })
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
@@ -1414,16 +2137,37 @@ def admin_update_event(event_id):
         capacity = request.form.get('capacity')
         event_type = request.form.get('event_type', 'general')
         require_approval = 'require_approval' in request.form
+        apply_to_series = 'apply_to_series' in request.form
         
         # Convert capacity to int if provided
         capacity_value = int(capacity) if capacity and capacity.strip() else None
         
+        if apply_to_series:
+            event = db.execute_single("SELECT series_id, event_date FROM events WHERE id = ?", (event_id,))
+            if event and event['series_id']:
+                # One set-based update for this and all following occurrences;
+                # each keeps its own day and takes the new time of day
+                db.execute_query("""
+                    UPDATE events SET title = ?, description = ?, location = ?, capacity = ?,
+                                    event_type = ?, require_approval = ?,
+                                    event_date = date(event_date) || ' ' || time(?)
+                    WHERE series_id = ? AND datetime(event_date) >= datetime(?)
+                """, (title, description, location, capacity_value, event_type, require_approval,
+                      event_date, event['series_id'], str(event['event_date'])))
+                db.execute_query("""
+                    UPDATE event_series SET title = ?, description = ?, location = ?, capacity = ?,
+                                          event_type = ?, require_approval = ?
+                    WHERE id = ?
+                """, (title, description, location, capacity_value, event_type, require_approval,
+                      event['series_id']))
+        
         db.execute_query("""
             UPDATE events SET title = ?, description = ?, event_date = ?, location = ?, 
                             capacity = ?, event_type = ?, require_approval = ?
             WHERE id = ?
         """, (title, description, event_date, location, capacity_value, event_type, 
               require_approval, event_id))
+        events_changed()
         
         return jsonify({'success': True, 'message': 'Event updated successfully'})
         
@@ -1452,6 +2196,7 @@ def admin_duplicate_event(event_id):
         """, (new_title, original_event['description'], new_date, original_event['location'],
               original_event.get('capacity'), original_event.get('event_type', 'general'),
               original_event.get('require_approval', False), session['user_id']))
+        events_changed()
         
         return jsonify({'success': True, 'message': 'Event duplicated successfully'})
         
@@ -1470,21 +2215,45 @@ def admin_broadcast_message(event_id):
         if not message:
             return jsonify({'success': False, 'message': 'Message is required'})
         
-        # Get registered users for this event
-        registrations = db.execute_query("""
-            SELECT er.user_id, ap.name, u.email
-            FROM event_registrations er
-            JOIN users u ON er.user_id = u.id
-            JOIN alumni_profiles ap ON er.user_id = ap.user_id
-            WHERE er.event_id = ?
-        """, (event_id,))
+        event = db.execute_single("SELECT id, title FROM events WHERE id = ?", (event_id,))
+        if not event:
+            return jsonify({'success': False, 'message': 'Event not found'})
+        
+        subject = data.get('subject') or f"Update: {event['title']}"
         
-        # In a real app, this would send actual notifications/emails
-        # For now, we'll just simulate it
+        # Get registered users for this event (shared broadcasts use the same
+        # rule when read, see BROADCAST_RECIPIENT_SQL)
+        recipient_ids = [row['user_id'] for row in db.execute_query("""
+            SELECT DISTINCT user_id FROM event_registrations
+            WHERE event_id = ? AND status != 'rejected' AND user_id != ?
+        """, (event_id, session['user_id'])) or []]
+        
+        if not recipient_ids:
+            return jsonify({'success': False, 'message': 'This event has no attendees to message'})
+        
+        shared = data.get('mode') == 'shared' or len(recipient_ids) >= Config.BROADCAST_FANOUT_THRESHOLD
+        if shared:
+            # Fan-out-on-read: one row, read state tracked per recipient
+            db.execute_query("""
+                INSERT INTO broadcasts (event_id, sender_id, subject, content, recipient_count)
+                VALUES (?, ?, ?, ?, ?)
+            """, (event_id, session['user_id'], subject, message, len(recipient_ids)))
+        else:
+            # One message per attendee, written in a single transaction
+            db.execute_many("""
+                INSERT INTO messages (sender_id, recipient_id, subject, content, conversation_id)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(session['user_id'], user_id, subject, message, conversation_key(session['user_id'], user_id))
+                  for user_id in recipient_ids])
+        unread_counts.publish(recipient_ids, 1)
+        
+        if data.get('send_email', True):
+            enqueue_job('event_broadcast_emails', {'event_id': event_id, 'subject': subject, 'message': message})
         
         return jsonify({
             'success': True, 
-            'message': f'Message broadcasted to {len(registrations)} attendees'
+            'message': f'Message broadcasted to {len(recipient_ids)} attendees',
+            'delivery': 'shared' if shared else 'per_recipient'
         })
         
     except Exception as e:
@@ -1501,6 +2270,7 @@ def admin_end_event(event_id):
             UPDATE events SET event_date = datetime('now', '-1 hour')
             WHERE id = ?
         """, (event_id,))
+        events_changed()
         
         return jsonify({'success': True, 'message': 'Event ended successfully'})
         
@@ -1526,6 +2296,7 @@ def admin_bulk_delete_events():
         # Delete events
         placeholders = ','.join(['?' for _ in event_ids])
         db.execute_query(f"DELETE FROM events WHERE id IN ({placeholders})", event_ids)
+        events_changed()
         
         return jsonify({
             'success': True, 
@@ -1548,21 +2319,20 @@ def admin_bulk_send_reminders():
         if not event_ids:
             return jsonify({'success': False, 'message': 'No events selected'})
         
-        total_sent = 0
-        for event_id in event_ids:
-            # Get registration count for each event
-            count = db.execute_single("""
-                SELECT COUNT(*) as count FROM event_registrations WHERE event_id = ?
-            """, (event_id,))
-            total_sent += count['count'] if count else 0
+        placeholders = ','.join(['?' for _ in event_ids])
+        total_sent = db.execute_single(f"""
+            SELECT COUNT(*) as count FROM event_registrations WHERE event_id IN ({placeholders})
+        """, event_ids)['count']
         
-        # In a real app, this would send actual reminders
+        job_id = enqueue_job('event_reminders', {'event_ids': event_ids})
         
         return jsonify({
             'success': True, 
-            'message': f'Reminders sent successfully',
+            'message': 'Reminders are being sent',
             'event_count': len(event_ids),
-            'total_recipients': total_sent
+            'total_recipients': total_sent,
+            'job_id': job_id,
+            'status_url': url_for('admin_job_status', job_id=job_id)
         })
         
     except Exception as e:
@@ -1574,94 +2344,56 @@ def admin_get_live_status():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        # Get ongoing events with current attendee counts
-        ongoing_events = db.execute_query("""
-            SELECT e.id, e.title, COUNT(er.id) as current_attendees
-            FROM events e
-            LEFT JOIN event_registrations er ON e.id = er.event_id
-            WHERE date(e.event_date) = date('now')
-            GROUP BY e.id
-        """)
+        # Served from the in-memory counters, no query per viewer
+        version, ongoing_events = live_board.snapshot()
         
-        return jsonify({'success': True, 'events': ongoing_events})
+        return jsonify({'success': True, 'version': version, 'events': ongoing_events})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/admin/events/live-stream')
+def admin_live_status_stream():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Server-sent events: one snapshot, then only changed counts
+    return stream_slots.response(live_board.stream())
+
 @app.route('/admin/events/export')
 def admin_export_events():
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'error': 'Unauthorized'}), 401
     
-    try:
-        event_ids = request.args.get('event_ids', '').split(',') if request.args.get('event_ids') else []
-        
-        if event_ids and event_ids[0]:  # If specific events requested
-            placeholders = ','.join(['?' for _ in event_ids])
-            events = db.execute_query(f"""
-                SELECT e.*, COUNT(er.id) as registration_count
-                FROM events e
-                LEFT JOIN event_registrations er ON e.id = er.event_id
-                WHERE e.id IN ({placeholders})
-                GROUP BY e.id
-                ORDER BY e.event_date DESC
-            """, event_ids)
-        else:  # Export all events
-            events = db.execute_query("""
-                SELECT e.*, COUNT(er.id) as registration_count
-                FROM events e
-                LEFT JOIN event_registrations er ON e.id = er.event_id
-                GROUP BY e.id
-                ORDER BY e.event_date DESC
-            """)
-        
-        # Create CSV content
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow(['Event ID', 'Title', 'Description', 'Date', 'Location', 'Type', 'Registrations', 'Status'])
-        
-        # Write data
-        current_time = datetime.now()
-        for event in events:
-            event_date = event['event_date']
-            if isinstance(event_date, str):
-                try:
-                    event_date = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
-                except:
-                    event_date = datetime.strptime(event_date, '%Y-%m-%d %H:%M:%S')
-            
-            # Determine status
-            if event_date.date() == current_time.date():
-                status = 'Ongoing'
-            elif event_date > current_time:
-                status = 'Upcoming'
-            else:
-                status = 'Past'
-            
-            writer.writerow([
-                event['id'],
-                event['title'],
-                event['description'],
-                event_date.strftime('%Y-%m-%d %H:%M:%S'),
-                event['location'] or '',
-                event.get('event_type', 'general'),
-                event['registration_count'],
-                status
-            ])
-        
-        # Create response
-        output.seek(0)
-        return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=f'events_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-        )
-        
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)})
+    return EXPORTS['events'].response(db, request.args, 'csv', compress=wants_gzip())
+
+@app.route('/admin/exports/<name>')
+def admin_export(name):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    export = EXPORTS.get(name)
+    fmt = request.args.get('format', 'csv')
+    if export is None:
+        return jsonify({'success': False, 'message': 'Unknown export'}), 404
+    if fmt not in FORMATS:
+        return jsonify({'success': False, 'message': f"Format must be one of: {', '.join(FORMATS)}"}), 400
+    
+    if request.args.get('background') in ('1', 'true'):
+        # Very large exports are written to a file by a job; poll the job for the download link
+        args = {key: value for key, value in request.args.items() if key in export.filters}
+        job_id = enqueue_job('export', {'name': name, 'args': args, 'format': fmt, 'gzip': wants_gzip()})
+        return jsonify({'success': True, 'job_id': job_id,
+                        'status_url': url_for('admin_job_status', job_id=job_id)})
+    
+    return export.response(db, request.args, fmt, compress=wants_gzip())
+
+@app.route('/admin/exports/files/<path:filename>')
+def admin_export_file(filename):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return send_from_directory(os.path.abspath(Config.EXPORT_FOLDER), filename, as_attachment=True)
 
 # Route to create sample events for testing
 @app.route('/admin/create-sample-events', methods=['POST'])
@@ -1712,11 +2444,45 @@ def create_sample_events():
             """, (event['title'], event['description'], event['event_date'], 
                   event['location'], session['user_id']))
             created_count += 1
+        events_changed()
         
         return jsonify({'success': True, 'message': f'Created {created_count} sample events successfully'})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+def create_app(init_schema=True):
+    """Finish start-up of this process and return the app.
+
+    Entry points (wsgi.py, `python app.py`, benchmarks) call this once per
+    process. Importing this module only builds the app; files, the database
+    connection and the schema are all set up here or on first use. Under
+    gunicorn the master has already checked the schema, so workers pass
+    init_schema=False and skip even the version check.
+    """
+    started = time.perf_counter()
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    install_bytecode_cache(app)
+    if init_schema:
+        with app.app_context():
+            init_database()
+    change_feed.subscribe('app_cache', invalidate_changed_tables, tables=list(CHANGE_TAGS), durable=False)
+    change_feed.subscribe('local_state', refresh_local_state, tables=LOCAL_STATE_TABLES, durable=False,
+                          skip_own=True)
+    if Config.TEMPLATE_WARMUP:
+        template_count, template_seconds = warm_up(app)
+        print(f"Precompiled {template_count} templates in {template_seconds * 1000:.0f} ms")
+    startup_seconds = time.perf_counter() - started
+    metrics.observe('startup.total_ms', startup_seconds * 1000)
+    print(f"App ready in {startup_seconds * 1000:.0f} ms (pid {os.getpid()})")
+    return app
+
+def after_fork():
+    """Per-process set-up for a worker forked from a process that loaded the app
+    (gunicorn with preload_app): SQLite connections and threads don't survive fork."""
+    db.reconnect()
+    job_queue.after_fork()
+    change_feed.after_fork()
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
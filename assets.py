@@ -0,0 +1,122 @@
+"""Fingerprinted, precompressed static assets.
+
+    python assets.py          # build static/dist and its manifest
+
+The build copies each CSS/JS file to static/dist/<name>.<hash><ext> along
+with .gz and (when the `brotli` package is installed) .br variants, and
+writes static/dist/manifest.json. Templates link assets with
+`asset_url('css/style.css')`; URLs change whenever the content does, so
+they are served with a one-year immutable cache lifetime. Without a build
+the original files are served with a ?v=<hash> query instead.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built
+    brotli = None
+
+ASSET_EXTENSIONS = ('.css', '.js')
+DIST_DIR = 'dist'
+MAX_AGE = 365 * 24 * 3600
+
+
+def _content_hash(path):
+    with open(path, 'rb') as source:
+        return hashlib.sha256(source.read()).hexdigest()[:12]
+
+
+def _sources(static_folder):
+    """Logical paths ('js/main.js') of every asset under the static folder"""
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if d not in (DIST_DIR, 'uploads')]
+        for name in files:
+            if name.endswith(ASSET_EXTENSIONS):
+                yield os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, '/')
+
+
+def build(static_folder):
+    """Write fingerprinted and compressed copies of every asset; return the manifest"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    manifest = {}
+    for logical in sorted(_sources(static_folder)):
+        with open(os.path.join(static_folder, logical), 'rb') as source:
+            body = source.read()
+        stem, ext = os.path.splitext(logical)
+        fingerprinted = f'{stem}.{hashlib.sha256(body).hexdigest()[:12]}{ext}'
+        target = os.path.join(dist, fingerprinted)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as output:
+            output.write(body)
+        with open(target + '.gz', 'wb') as output:
+            output.write(gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(target + '.br', 'wb') as output:
+                output.write(brotli.compress(body, quality=11))
+        manifest[logical] = fingerprinted
+
+    with open(os.path.join(dist, 'manifest.json'), 'w') as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    return manifest
+
+
+class Assets:
+    """Jinja `asset_url()` helper and the /assets/ route for a Flask app"""
+
+    def __init__(self, app=None):
+        self._manifest = None
+        self._hashes = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.dist_folder = os.path.join(app.static_folder, DIST_DIR)
+        manifest_path = os.path.join(self.dist_folder, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as source:
+                self._manifest = json.load(source)
+        app.add_url_rule('/assets/<path:filename>', 'assets', self.serve)
+        app.jinja_env.globals['asset_url'] = self.url
+
+    def url(self, logical):
+        if self._manifest and logical in self._manifest:
+            return url_for('assets', filename=self._manifest[logical])
+        # Unbuilt checkout: version the original file by its current content
+        if logical not in self._hashes:
+            self._hashes[logical] = _content_hash(os.path.join(self.static_folder, logical))
+        return url_for('assets', filename=logical, v=self._hashes[logical])
+
+    def serve(self, filename):
+        folder = self.dist_folder if self._manifest and os.path.exists(
+            os.path.join(self.dist_folder, filename)) else self.static_folder
+        accepted = request.accept_encodings
+        encoding = None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accepted[candidate] and os.path.exists(os.path.join(folder, filename + suffix)):
+                encoding = candidate
+                break
+
+        response = send_from_directory(folder, filename + ('.br' if encoding == 'br' else '.gz' if encoding else ''),
+                                       mimetype='text/css' if filename.endswith('.css') else 'text/javascript',
+                                       conditional=True, max_age=MAX_AGE)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.immutable = True
+        return response
+
+
+if __name__ == '__main__':
+    static = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    built = build(static)
+    for logical, fingerprinted in built.items():
+        print(f'{logical} -> {DIST_DIR}/{fingerprinted}')
+    sys.exit(0)
@@ -0,0 +1,320 @@
+"""Application caches.
+
+`TTLCache` is a small per-process map for single call sites. `Cache` is the
+shared layer on top of a backend:
+
+    profiles = app_cache.namespace('profiles')
+    row = profiles.get_or_set(user_id, lambda: load(user_id), ttl=30, tags=['users'])
+    app_cache.invalidate('users')             # drops every entry tagged 'users'
+    profiles.invalidate_namespace()           # drops everything in 'profiles'
+
+    @app_cache.memoize(ttl=60, tags=['events'])
+    def upcoming_events(): ...
+
+Tags work by version numbers kept in the backend: an entry records the
+versions of its tags when it was computed and is ignored once any of them
+has been bumped. With the SQLite backend the entries and the versions are
+shared by every worker process on the host, so an invalidation in one
+worker is seen by all of them.
+"""
+
+import functools
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from metrics import metrics
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Small thread-safe in-process cache with per-entry expiry and a size bound"""
+
+    def __init__(self, ttl=30, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key, value, ttl=None):
+        """Set only when the key is absent or expired; True if it was set"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+        self.set(key, value, ttl)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class MemoryBackend(TTLCache):
+    """LRU entries and tag versions private to this process"""
+
+    shared = False
+
+    def __init__(self, max_entries=None):
+        super().__init__(ttl=Config.CACHE_DEFAULT_TTL, max_entries=max_entries or Config.CACHE_MAX_ENTRIES)
+        self._versions = {}
+
+    def versions(self, tags):
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+
+class SQLiteBackend:
+    """Entries and tag versions in a SQLite file shared by all worker processes.
+
+    Values are pickled. Each thread (and each forked process) opens its own
+    connection. Expired and least-recently-written entries beyond
+    `max_entries` are pruned now and then on writes.
+    """
+
+    shared = True
+    PRUNE_EVERY = 200  # writes, on average
+
+    def __init__(self, path=None, max_entries=None):
+        self.path = path or Config.CACHE_DATABASE_PATH
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+        self._local = threading.local()
+        self._schema_ready = False
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            if not self._schema_ready:
+                connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS cache_entries (
+                        key TEXT PRIMARY KEY,
+                        value BLOB NOT NULL,
+                        expires_at REAL NOT NULL
+                    ) WITHOUT ROWID;
+                    CREATE INDEX IF NOT EXISTS idx_cache_entries_expiry ON cache_entries(expires_at);
+                    CREATE TABLE IF NOT EXISTS cache_tags (
+                        tag TEXT PRIMARY KEY,
+                        version INTEGER NOT NULL
+                    ) WITHOUT ROWID;
+                """)
+                self._schema_ready = True
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def get(self, key, default=None):
+        row = self.connection.execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at >= ?", (key, time.time())).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        self.connection.execute("""
+            INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+        """, (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time() + (ttl or Config.CACHE_DEFAULT_TTL)))
+        if random.randrange(self.PRUNE_EVERY) == 0:
+            self.prune()
+
+    def add(self, key, value, ttl=None):
+        now = time.time()
+        cursor = self.connection.execute("""
+            INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+            WHERE cache_entries.expires_at < ?
+        """, (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + (ttl or Config.CACHE_DEFAULT_TTL), now))
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self.connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        self.connection.execute("DELETE FROM cache_entries")
+
+    def prune(self):
+        connection = self.connection
+        connection.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+        connection.execute("""
+            DELETE FROM cache_entries WHERE key IN (
+                SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def versions(self, tags):
+        if not tags:
+            return ()
+        placeholders = ','.join('?' for _ in tags)
+        found = dict(self.connection.execute(
+            f"SELECT tag, version FROM cache_tags WHERE tag IN ({placeholders})", list(tags)).fetchall())
+        return tuple(found.get(tag, 0) for tag in tags)
+
+    def bump(self, tags):
+        self.connection.executemany("""
+            INSERT INTO cache_tags (tag, version) VALUES (?, 1)
+            ON CONFLICT (tag) DO UPDATE SET version = version + 1
+        """, [(tag,) for tag in tags])
+
+
+BACKENDS = {
+    'memory': MemoryBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+class Cache:
+    """Namespaced, tag-invalidated cache over a backend, with single-flight fills.
+
+    `get_or_set()` lets one caller per key compute a missing value while
+    concurrent callers in the same process wait for it; with a shared
+    backend a short lease in the backend also keeps other processes from
+    recomputing the same key at the same time.
+    """
+
+    def __init__(self, backend=None, namespace='default', ttl=None):
+        self.backend = backend if backend is not None else BACKENDS[Config.CACHE_BACKEND]()
+        self.name = namespace
+        self.ttl = ttl or Config.CACHE_DEFAULT_TTL
+        self._flights = ({}, threading.Lock())  # key -> [lock, waiters], shared by namespaces
+
+    def namespace(self, name, ttl=None):
+        """A view of the same backend whose keys live under `name`"""
+        view = Cache(self.backend, name, ttl or self.ttl)
+        view._flights = self._flights
+        return view
+
+    def _key(self, key):
+        return f'{self.name}:{key}'
+
+    def _tags(self, tags):
+        return (f'namespace:{self.name}',) + tuple(tags)
+
+    def _lookup(self, key):
+        entry = self.backend.get(self._key(key))
+        if entry is not None:
+            tags, versions, value = entry
+            if self.backend.versions(tags) == versions:
+                return value
+        return _MISSING
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        metrics.increment(f'cache.{self.name}.{"miss" if value is _MISSING else "hit"}')
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None, tags=(), versions=None):
+        tags = self._tags(tags)
+        if versions is None:
+            versions = self.backend.versions(tags)
+        self.backend.set(self._key(key), (tags, versions, value), ttl or self.ttl)
+
+    def delete(self, key):
+        self.backend.delete(self._key(key))
+
+    def invalidate(self, *tags):
+        """Drop every entry, in any namespace, carrying one of `tags`"""
+        self.backend.bump(tags)
+
+    def invalidate_namespace(self):
+        self.backend.bump(self._tags(()))
+
+    def get_or_set(self, key, compute, ttl=None, tags=()):
+        value = self._lookup(key)
+        if value is not _MISSING:
+            metrics.increment(f'cache.{self.name}.hit')
+            return value
+
+        flights, flights_lock = self._flights
+        full_key = self._key(key)
+        with flights_lock:
+            flight = flights.setdefault(full_key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                value = self._lookup(key)  # filled while we waited
+                if value is not _MISSING:
+                    metrics.increment(f'cache.{self.name}.coalesced')
+                    return value
+                metrics.increment(f'cache.{self.name}.miss')
+                return self._fill(key, compute, ttl, tags)
+        finally:
+            with flights_lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del flights[full_key]
+
+    def _fill(self, key, compute, ttl, tags):
+        lease = f'lease:{self._key(key)}'
+        if self.backend.shared and not self.backend.add(lease, os.getpid(), Config.CACHE_LEASE_TIMEOUT):
+            # Another process is computing it; wait for its result up to the lease timeout
+            deadline = time.monotonic() + Config.CACHE_LEASE_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    metrics.increment(f'cache.{self.name}.coalesced')
+                    return value
+            lease = None
+        versions = self.backend.versions(self._tags(tags))  # a write during compute leaves the entry stale
+        try:
+            value = compute()
+            self.set(key, value, ttl, tags, versions)
+            return value
+        finally:
+            if lease and self.backend.shared:
+                self.backend.delete(lease)
+
+    def memoize(self, ttl=None, tags=(), key=None):
+        """Cache a function's result per arguments (or per `key(*args, **kwargs)`).
+
+        Works for Flask views that return a dict (sent as JSON); vary such
+        views on the user with e.g. key=lambda **kw: session['user_id'].
+        """
+        def decorator(func):
+            name = f'{func.__module__}.{func.__qualname__}'
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                suffix = key(*args, **kwargs) if key else f'{args!r}:{sorted(kwargs.items())!r}'
+                return self.get_or_set(f'{name}:{suffix}', lambda: func(*args, **kwargs), ttl, tags)
+
+            wrapper.uncached = func
+            return wrapper
+        return decorator
+
+
+app_cache = Cache()
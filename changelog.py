@@ -0,0 +1,298 @@
+"""Change data capture for the core tables.
+
+SQLite triggers append one `change_log` row per inserted, updated or
+deleted row of the tables in TABLES, so writes from any route, job or
+process are captured without touching the code that makes them. `seq` is
+an AUTOINCREMENT key and never reused, so consumers can track their
+position with a single number:
+
+    @change_feed.subscriber('search_index', tables=['alumni_profiles'])
+    def reindex(changes):
+        for change in changes:
+            ...
+
+Durable subscribers keep their position in `change_cursors` and resume
+from it after a restart (delivery is at-least-once). Non-durable ones,
+such as in-process caches that start out empty, begin at the current end
+of the log. Streams that track their own position (an SSE client's
+Last-Event-ID) can read the log directly with `changes_since()`.
+
+A connection passed to `mark_origin()` stamps the changes it writes with
+the process id. Subscribers registered with skip_own=True don't see those
+changes, for state the process already updated when it made the write.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+
+from config import Config
+
+# table -> JSON details recorded with each change ({row} is NEW or OLD)
+TABLES = {
+    'users': "json_object('role', {row}.role, 'is_verified', {row}.is_verified)",
+    'alumni_profiles': "json_object('user_id', {row}.user_id)",
+    'events': "json_object('series_id', {row}.series_id)",
+    'event_registrations': "json_object('event_id', {row}.event_id, 'user_id', {row}.user_id)",
+    'messages': "json_object('sender_id', {row}.sender_id, 'recipient_id', {row}.recipient_id)",
+    'forum_posts': "json_object('author_id', {row}.author_id)",
+    'job_postings': "json_object('posted_by', {row}.posted_by)",
+    'announcements': "json_object('is_active', {row}.is_active)",
+    'broadcasts': "json_object('event_id', {row}.event_id)",
+    'broadcast_reads': "json_object('user_id', {row}.user_id)",
+}
+
+# Tables without an `id` column, and the column recorded as their row_id
+ROW_IDS = {
+    'broadcast_reads': 'broadcast_id',
+}
+
+
+def _triggers(table):
+    details = TABLES[table]
+    row_id = ROW_IDS.get(table, 'id')
+    for operation, row in (('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD')):
+        yield f"""
+            CREATE TRIGGER IF NOT EXISTS change_log_{table}_{operation} AFTER {operation.upper()} ON {table}
+            BEGIN
+                INSERT INTO change_log (table_name, row_id, operation, details)
+                VALUES ('{table}', {row}.{row_id}, '{operation}', {details.format(row=row)});
+            END
+        """
+
+
+def install(db):
+    """Create the log tables and the capture triggers"""
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER,
+            operation TEXT NOT NULL CHECK(operation IN ('insert', 'update', 'delete')),
+            details TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            origin INTEGER
+        )
+    """)
+    db.add_column_if_missing('change_log', 'origin', 'INTEGER')
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS change_cursors (
+            name TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    """)
+    for table in TABLES:
+        for trigger in _triggers(table):
+            db.execute_query(trigger)
+
+
+def mark_origin(connection):
+    """Stamp the changes written through `connection` with this process's id.
+
+    A TEMP trigger belongs to the connection that creates it, so writes made
+    through any other connection or process are left unstamped. Does nothing
+    until install() has created the origin column.
+    """
+    columns = {row[1] for row in connection.execute("PRAGMA main.table_info(change_log)")}
+    if 'origin' not in columns:
+        return False
+    connection.execute(f"""
+        CREATE TEMP TRIGGER IF NOT EXISTS change_log_origin AFTER INSERT ON main.change_log
+        BEGIN
+            UPDATE change_log SET origin = {os.getpid()} WHERE seq = NEW.seq;
+        END
+    """)
+    return True
+
+
+class _Subscriber:
+    def __init__(self, name, callback, tables, durable, position, skip_own):
+        self.name = name
+        self.callback = callback
+        self.tables = set(tables) if tables else None
+        self.durable = durable
+        self.position = position
+        self.skip_own = skip_own
+
+
+class ChangeFeed:
+    """Delivers new `change_log` rows to subscribers from a polling thread.
+
+    Each change is a dict with seq, table_name, row_id, operation, details
+    (decoded JSON) and changed_at. A subscriber's callback receives the
+    changes in seq order, in batches; its position advances only after the
+    callback returns, so a failing callback sees the same batch again.
+    """
+
+    def __init__(self, db_path=None, poll_interval=None, batch_size=None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.poll_interval = poll_interval or Config.CHANGE_FEED_POLL_INTERVAL
+        self.batch_size = batch_size or Config.CHANGE_FEED_BATCH_SIZE
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def latest_seq(self):
+        connection = self._connect()
+        try:
+            return connection.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+        finally:
+            connection.close()
+
+    def changes_since(self, seq, tables=None, limit=None):
+        """Changes after `seq` (oldest first), optionally only for `tables`"""
+        query = "SELECT * FROM change_log WHERE seq > ?"
+        params = [seq]
+        if tables:
+            query += f" AND table_name IN ({','.join('?' for _ in tables)})"
+            params.extend(tables)
+        query += " ORDER BY seq LIMIT ?"
+        params.append(limit or self.batch_size)
+        connection = self._connect()
+        try:
+            rows = connection.execute(query, params).fetchall()
+        finally:
+            connection.close()
+        changes = []
+        for row in rows:
+            change = dict(row)
+            change['details'] = json.loads(change['details']) if change['details'] else {}
+            changes.append(change)
+        return changes
+
+    def subscribe(self, name, callback, tables=None, durable=True, skip_own=False):
+        """Deliver changes to `callback(changes)` from now on (or from the stored position).
+
+        With skip_own, changes this process stamped (see mark_origin) are passed over.
+        """
+        position = None
+        if durable:
+            connection = self._connect()
+            try:
+                row = connection.execute("SELECT seq FROM change_cursors WHERE name = ?", (name,)).fetchone()
+            finally:
+                connection.close()
+            position = row['seq'] if row else None
+        if position is None:
+            position = self.latest_seq()
+        with self._lock:
+            self._subscribers[name] = _Subscriber(name, callback, tables, durable, position, skip_own)
+        self.start()
+        return position
+
+    def subscriber(self, name, tables=None, durable=True, skip_own=False):
+        """Decorator form of subscribe()"""
+        def decorator(func):
+            self.subscribe(name, func, tables, durable, skip_own)
+            return func
+        return decorator
+
+    def unsubscribe(self, name):
+        with self._lock:
+            self._subscribers.pop(name, None)
+
+    def notify(self):
+        """Poll now instead of at the next interval (after a local write)"""
+        self._wakeup.set()
+
+    def poll(self):
+        """Deliver everything pending to every subscriber; return how many changes were delivered"""
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        delivered = 0
+        for subscriber in subscribers:
+            while True:
+                changes = self.changes_since(subscriber.position, subscriber.tables)
+                if not changes:
+                    break
+                pending = changes
+                if subscriber.skip_own:
+                    pid = os.getpid()
+                    pending = [change for change in changes if change['origin'] != pid]
+                try:
+                    if pending:
+                        subscriber.callback(pending)
+                except Exception:
+                    traceback.print_exc()
+                    break  # retried from the same position on the next poll
+                subscriber.position = changes[-1]['seq']
+                delivered += len(changes)
+                if subscriber.durable:
+                    self._save_position(subscriber)
+                if len(changes) < self.batch_size:
+                    break
+        return delivered
+
+    def _save_position(self, subscriber):
+        connection = self._connect()
+        try:
+            connection.execute("""
+                INSERT INTO change_cursors (name, seq) VALUES (?, ?)
+                ON CONFLICT (name) DO UPDATE SET seq = excluded.seq, updated_at = CURRENT_TIMESTAMP
+            """, (subscriber.name, subscriber.position))
+        finally:
+            connection.close()
+
+    def prune(self, retention_days=None):
+        """Delete old changes that every durable subscriber has already processed"""
+        connection = self._connect()
+        try:
+            cursor = connection.execute("""
+                DELETE FROM change_log
+                WHERE changed_at < datetime('now', ?)
+                  AND seq <= COALESCE((SELECT MIN(seq) FROM change_cursors), (SELECT MAX(seq) FROM change_log))
+            """, (f'-{retention_days or Config.CHANGE_LOG_RETENTION_DAYS} days',))
+            return cursor.rowcount
+        finally:
+            connection.close()
+
+    def start(self):
+        """Start the polling thread once per process"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+            self._thread.start()
+
+    def after_fork(self):
+        """Restart polling in a forked child; the parent's thread isn't inherited"""
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        if self._subscribers:
+            self.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self._stopping.clear()
+
+    def _run(self):
+        last_pruned = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                self.poll()
+                if time.monotonic() - last_pruned > 3600:
+                    self.prune()
+                    last_pruned = time.monotonic()
+            except sqlite3.Error:
+                traceback.print_exc()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,226 @@
+import time
+import zlib
+
+from config import Config
+from metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+SKIP_STATUSES = ('204', '206', '304')
+
+
+class _GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        """Emit everything compressed so far without ending the stream"""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _Primed:
+    """Body iterable with its first chunk already pulled"""
+
+    def __init__(self, body):
+        self._body = body
+        self._iterator = iter(body)
+        self._first = [chunk for chunk in (next(self._iterator, None),) if chunk is not None]
+
+    def __iter__(self):
+        yield from self._first
+        yield from self._iterator
+
+    def close(self):
+        if hasattr(self._body, 'close'):
+            self._body.close()
+
+
+class CompressionMiddleware:
+    """Compress text responses (HTML, JSON, CSV, ...) for clients that accept it.
+
+    Responses with a known Content-Length below `min_size`, already-encoded
+    responses, partial/empty responses and content types outside the
+    allowlist pass through untouched, as do HEAD requests. Compressed
+    responses keep their ETag, strong or weak, with the coding appended
+    ('"abc"' becomes '"abc-gzip"'), and the suffix is taken off again in
+    If-None-Match/If-Match so the app's conditional checks still match.
+    Responses without a Content-Length
+    (streamed generators) are compressed chunk by chunk, flushing after
+    each chunk so clients still see data as soon as it is produced.
+    Ratios and CPU time are reported to `metrics`.
+    """
+
+    def __init__(self, app, min_size=None, level=None, content_types=None, streaming=True):
+        self.app = app
+        self.min_size = Config.COMPRESSION_MIN_SIZE if min_size is None else min_size
+        self.level = level or Config.COMPRESSION_LEVEL
+        self.content_types = set(content_types or Config.COMPRESSION_TYPES)
+        self.streaming = streaming
+
+    def _negotiate(self, environ):
+        """Encoder class for the best accepted coding, or None"""
+        qualities = {}
+        for part in environ.get('HTTP_ACCEPT_ENCODING', '').lower().split(','):
+            coding, _, params = part.partition(';')
+            params = params.strip()
+            try:
+                qualities[coding.strip()] = float(params[2:]) if params.startswith('q=') else 1.0
+            except ValueError:
+                qualities[coding.strip()] = 0.0
+        if brotli is not None and qualities.get('br', 0) > 0:
+            return _BrotliEncoder
+        if qualities.get('gzip', 0) > 0:
+            return _GzipEncoder
+        return None
+
+    def _skip_reason(self, status, headers):
+        values = {name.lower(): value for name, value in headers}
+        if status.split(' ', 1)[0] in SKIP_STATUSES:
+            return 'status'
+        if 'content-encoding' in values:
+            return 'encoded'
+        if 'no-transform' in values.get('cache-control', ''):
+            return 'no-transform'
+        if values.get('content-type', '').split(';')[0].strip() not in self.content_types:
+            return 'content_type'
+        length = values.get('content-length')
+        if length is not None and int(length) < self.min_size:
+            return 'small'
+        if length is None and not self.streaming:
+            return 'streaming'
+        return None
+
+    @staticmethod
+    def _tag_etags(headers, suffix):
+        """Append the coding to ETag values: '"abc"' -> '"abc-gzip"' (W/ kept)"""
+        return [(name, f'{value[:-1]}{suffix}"' if name.lower() == 'etag' and value.endswith('"') else value)
+                for name, value in headers]
+
+    @staticmethod
+    def _untag_conditionals(environ, suffix):
+        """Strip the coding from the ETags a client sends back; True if any had it"""
+        tagged = False
+        for key in ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH'):
+            value = environ.get(key)
+            if value and f'{suffix}"' in value:
+                environ[key] = value.replace(f'{suffix}"', '"')
+                tagged = True
+        return tagged
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            metrics.increment('compression.skipped.head')  # no body, so nothing to encode
+            return self.app(environ, start_response)
+        encoder_class = self._negotiate(environ)
+        if encoder_class is None:
+            return self.app(environ, start_response)
+        suffix = f'-{encoder_class.name}'
+        variant_cached = self._untag_conditionals(environ, suffix)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured['status'], captured['headers'], captured['exc_info'] = status, headers, exc_info
+            return lambda data: None  # the legacy write() callable isn't used by Flask
+
+        body = self.app(environ, capture)
+        if 'status' not in captured:
+            body = _Primed(body)  # generator apps call start_response on first iteration
+        status, headers = captured['status'], captured['headers']
+        reason = self._skip_reason(status, headers)
+        if reason:
+            metrics.increment(f'compression.skipped.{reason}')
+            if variant_cached and status.startswith('304'):
+                headers = self._tag_etags(headers, suffix)  # confirms the client's encoded copy
+            start_response(status, headers, captured['exc_info'])
+            return body
+
+        streamed = not any(name.lower() == 'content-length' for name, _ in headers)
+        headers = [(name, value) for name, value in headers if name.lower() != 'content-length']
+        headers = self._tag_etags(headers, suffix)  # the encoded bytes differ from the original
+        vary = [value for name, value in headers if name.lower() == 'vary']
+        headers = [(name, value) for name, value in headers if name.lower() != 'vary']
+        headers.append(('Vary', ', '.join(vary + ['Accept-Encoding'])))
+        headers.append(('Content-Encoding', encoder_class.name))
+
+        encoder = encoder_class(self.level)
+        if streamed:
+            start_response(status, headers, captured['exc_info'])
+            return self._stream(body, encoder)
+
+        # Buffered response: compress it whole and send an exact Content-Length
+        cpu_started = time.thread_time()
+        size_in = 0
+        parts = []
+        try:
+            for chunk in body:
+                size_in += len(chunk)
+                parts.append(encoder.compress(chunk))
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        parts.append(encoder.finish())
+        compressed = b''.join(parts)
+        self._record(encoder.name, size_in, len(compressed), time.thread_time() - cpu_started)
+        headers.append(('Content-Length', str(len(compressed))))
+        start_response(status, headers, captured['exc_info'])
+        return [compressed]
+
+    def _stream(self, body, encoder):
+        size_in = size_out = 0
+        cpu = 0.0
+        try:
+            for chunk in body:
+                if not chunk:
+                    continue
+                started = time.thread_time()
+                data = encoder.compress(chunk) + encoder.flush()
+                cpu += time.thread_time() - started
+                size_in += len(chunk)
+                size_out += len(data)
+                yield data
+            tail = encoder.finish()
+            size_out += len(tail)
+            yield tail
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+            self._record(encoder.name, size_in, size_out, cpu, streamed=True)
+
+    @staticmethod
+    def _record(encoding, size_in, size_out, cpu_seconds, streamed=False):
+        metrics.increment(f'compression.responses.{encoding}')
+        if streamed:
+            metrics.increment('compression.responses.streamed')
+        metrics.increment('compression.bytes_in', size_in)
+        metrics.increment('compression.bytes_out', size_out)
+        metrics.observe('compression.cpu_ms', cpu_seconds * 1000)
+        if size_in:
+            metrics.observe('compression.ratio', size_out / size_in)
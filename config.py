@@ -10,6 +10,109 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
     
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
+    
+    # Uploaded files are stored once per distinct body (see storage.py)
+    STORAGE_BACKEND = 'local'
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    MAX_PROFILE_PICTURE_SIZE = 5 * 1024 * 1024
+    MAX_CV_SIZE = 10 * 1024 * 1024
+    FILE_ACCESS_CACHE_TTL = 60  # seconds a file's owner/privacy lookup is reused
+    FILE_MAX_AGE = 365 * 24 * 3600  # content-addressed names never change
+    
+    # Response compression (see compression.py); event streams are left alone
+    COMPRESSION_MIN_SIZE = 500  # bytes
+    COMPRESSION_LEVEL = 6
+    COMPRESSION_TYPES = {'text/html', 'text/plain', 'text/css', 'text/javascript', 'text/csv', 'text/calendar',
+                         'application/json', 'application/javascript', 'application/x-ndjson', 'image/svg+xml'}
+    
+    # Compiled templates (see templating.py); warm-up loads them all at startup
+    TEMPLATE_CACHE_FOLDER = '.jinja_cache'
+    TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', '1') == '1'
+    
+    # Upper bound on occurrences materialized for one recurring event series
+    MAX_SERIES_OCCURRENCES = 366
+    
+    # Messages returned per page by the inbox/sent/conversation endpoints
+    MESSAGES_PAGE_SIZE = 20
+    
+    # Compose recipient typeahead
+    RECIPIENT_SEARCH_MIN_CHARS = 2
+    RECIPIENT_SEARCH_MAX_RESULTS = 25
+    RECIPIENT_SEARCH_CACHE_TTL = 30  # seconds
+    
+    # Server-sent event streams (inbox unread count, admin live status). Each
+    # holds a worker thread, so keep SSE_MAX_STREAMS below WEB_THREADS
+    SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 4))  # per process
+    SSE_MAX_DURATION = 300  # seconds before a stream ends and the client reconnects
+    SSE_RETRY_AFTER = 30  # seconds a turned-away client waits (it polls meanwhile)
+    
+    # Event broadcasts to at least this many attendees are stored once and
+    # read through the event registrations instead of copied per recipient
+    BROADCAST_FANOUT_THRESHOLD = 2000
+    
+    # Background job queue
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+    JOB_POLL_INTERVAL = 2  # seconds between checks when the queue is idle
+    JOB_MAX_ATTEMPTS = 5
+    JOB_RETRY_BASE_SECONDS = 10  # doubled after each failed attempt
+    JOB_RETRY_MAX_SECONDS = 600
+    
+    # Outgoing email; without SMTP_HOST the outbox logs messages instead
+    SMTP_HOST = os.environ.get('SMTP_HOST')
+    SMTP_PORT = int(os.environ.get('SMTP_PORT', 25))
+    SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+    SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS') == '1'
+    SMTP_POOL_SIZE = 4  # concurrent connections
+    SMTP_BATCH_SIZE = 100  # messages sent per connection checkout
+    SMTP_RATE_LIMIT = float(os.environ.get('SMTP_RATE_LIMIT', 0))  # messages/second, 0 = unlimited
+    MAIL_FROM = os.environ.get('MAIL_FROM', 'alumni@college.edu')
+    MAIL_MAX_ATTEMPTS = 5
+    
+    # Exports stream rows from the database this many at a time
+    EXPORT_BATCH_SIZE = 500
+    EXPORT_FOLDER = 'exports'  # files written by background exports
+    
+    # Bulk alumni import: rows inserted per transaction
+    IMPORT_CHUNK_SIZE = 5000
+    
+    # Admin dashboard totals are cached for this long (seconds); with
+    # incremental counters on, writes update the cached totals in place
+    DASHBOARD_STATS_TTL = 60
+    DASHBOARD_STATS_INCREMENTAL = True
+    
+    # Application cache (see cache.py): 'memory' is per process, 'sqlite'
+    # is shared by all worker processes on the host
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_DATABASE_PATH = 'cache.db'
+    CACHE_MAX_ENTRIES = 10000
+    CACHE_DEFAULT_TTL = 300  # seconds
+    CACHE_LEASE_TIMEOUT = 5  # seconds another process may spend filling a key
+    
+    # Password hashing (see passwords.py); the bcrypt cost is tuned to the
+    # target time at startup unless PASSWORD_BCRYPT_COST is set
+    PASSWORD_BCRYPT_COST = int(os.environ['PASSWORD_BCRYPT_COST']) if os.environ.get('PASSWORD_BCRYPT_COST') else None
+    PASSWORD_HASH_TARGET_MS = 250
+    PASSWORD_MIN_COST = 10
+    PASSWORD_MAX_COST = 14
+    PASSWORD_HASH_WORKERS = None  # default: one per CPU
+    PASSWORD_MAX_PENDING = 32  # waiting hashes before logins are turned away
+    PASSWORD_IMPORT_WORKERS = 1  # bulk import hashing, kept off the login pool
+    PASSWORD_IMPORT_NICENESS = 10
+    
+    # Change log consumers (see changelog.py)
+    CHANGE_FEED_POLL_INTERVAL = 1  # seconds
+    CHANGE_FEED_BATCH_SIZE = 500
+    CHANGE_LOG_RETENTION_DAYS = 7
+    
+    # Logged-in user's user/profile rows are reused across requests this long
+    USER_CACHE_TTL = 30  # seconds
+    
+    # {% cache %} template fragments (see fragments.py)
+    FRAGMENT_CACHE_TTL = 300  # seconds, when the tag gives none
+    
+    # Longest chart series served by /admin/analytics/series
+    ANALYTICS_MAX_POINTS = 2000
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
\ No newline at end of file
@@ -0,0 +1,291 @@
+import csv
+import io
+import json
+import os
+import uuid
+import zlib
+from datetime import datetime
+
+from flask import Response, request
+
+from config import Config
+
+
+def csv_chunks(header, rows, rows_per_chunk=None):
+    """Encode rows as CSV, yielding UTF-8 bytes every `rows_per_chunk` rows"""
+    rows_per_chunk = rows_per_chunk or Config.EXPORT_BATCH_SIZE
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode('utf-8')
+
+
+def jsonl_chunks(keys, rows, rows_per_chunk=None):
+    """Encode rows as JSON Lines objects keyed by `keys`"""
+    rows_per_chunk = rows_per_chunk or Config.EXPORT_BATCH_SIZE
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(keys, row)), default=str))
+        if len(lines) >= rows_per_chunk:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte stream into a gzip stream without buffering it"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# format -> (mimetype, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+def wants_gzip():
+    """True when the request asked for a compressed download (?gzip=1)"""
+    return request.args.get('gzip') in ('1', 'true')
+
+
+def download_response(chunks, filename, mimetype, compress=False):
+    """Streamed attachment response; gzip-compressed when `compress` is set"""
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    return Response(chunks, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+class Export:
+    """A declarative export: which rows, which columns, which filters.
+
+    `columns` are (key, header, sql expression) triples; the key names the
+    field in JSON Lines output and the header titles the CSV column.
+    `filters` map a request argument to a SQL condition with one `?`, or
+    with `{}` for a comma-separated list of values.
+    """
+
+    def __init__(self, name, source, columns, where=None, filters=None, order_by=None):
+        self.name = name
+        self.source = source
+        self.columns = columns
+        self.where = where
+        self.filters = filters or {}
+        self.order_by = order_by
+
+    @property
+    def keys(self):
+        return [key for key, _, _ in self.columns]
+
+    @property
+    def headers(self):
+        return [header for _, header, _ in self.columns]
+
+    def query(self, args):
+        """SQL and parameters for the rows selected by `args`"""
+        conditions = [self.where] if self.where else []
+        params = []
+        for arg, condition in self.filters.items():
+            value = args.get(arg)
+            if value in (None, ''):
+                continue
+            if '{}' in condition:
+                values = [v for v in str(value).split(',') if v]
+                conditions.append(condition.format(','.join(['?' for _ in values])))
+                params.extend(values)
+            else:
+                conditions.append(condition)
+                params.append(value)
+
+        select = ', '.join(f'{expression} AS "{key}"' for key, _, expression in self.columns)
+        sql = f"SELECT {select} FROM {self.source}"
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(f'({condition})' for condition in conditions)
+        if self.order_by:
+            sql += f' ORDER BY {self.order_by}'
+        return sql, params
+
+    def count(self, db, args):
+        sql, params = self.query(args)
+        row = db.execute_single(f"SELECT COUNT(*) as count FROM ({sql})", params)
+        return row['count'] if row else 0
+
+    def rows(self, db, args):
+        """Row value lists, read from the database in batches"""
+        sql, params = self.query(args)
+        for row in db.iter_query(sql, params, batch_size=Config.EXPORT_BATCH_SIZE):
+            yield list(row.values())
+
+    def chunks(self, db, args, fmt='csv', rows=None):
+        rows = self.rows(db, args) if rows is None else rows
+        if fmt == 'jsonl':
+            return jsonl_chunks(self.keys, rows)
+        return csv_chunks(self.headers, rows)
+
+    def filename(self, fmt='csv'):
+        return f'{self.name}_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{FORMATS[fmt][1]}'
+
+    def response(self, db, args, fmt='csv', compress=False):
+        return download_response(self.chunks(db, args, fmt), self.filename(fmt), FORMATS[fmt][0], compress)
+
+    def write_file(self, db, args, fmt='csv', compress=False, progress=None):
+        """Write the export into EXPORT_FOLDER; return (file name, row count)"""
+        os.makedirs(Config.EXPORT_FOLDER, exist_ok=True)
+        filename = self.filename(fmt).replace('_export_', f'_export_{uuid.uuid4().hex[:8]}_')
+        if compress:
+            filename += '.gz'
+
+        counted = {'rows': 0}
+
+        def counting(rows):
+            for row in rows:
+                yield row
+                counted['rows'] += 1
+                if progress and counted['rows'] % Config.EXPORT_BATCH_SIZE == 0:
+                    progress(counted['rows'])
+
+        chunks = self.chunks(db, args, fmt, rows=counting(self.rows(db, args)))
+        if compress:
+            chunks = gzip_chunks(chunks)
+        path = os.path.join(Config.EXPORT_FOLDER, filename)
+        with open(path + '.part', 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        os.replace(path + '.part', path)  # never serve a half-written file
+        return filename, counted['rows']
+
+
+EXPORTS = {export.name: export for export in [
+    Export(
+        'events',
+        source='events e',
+        columns=[
+            ('id', 'Event ID', 'e.id'),
+            ('title', 'Title', 'e.title'),
+            ('description', 'Description', 'e.description'),
+            ('event_date', 'Date', "COALESCE(strftime('%Y-%m-%d %H:%M:%S', e.event_date), e.event_date)"),
+            ('location', 'Location', "COALESCE(e.location, '')"),
+            ('event_type', 'Type', "COALESCE(e.event_type, 'general')"),
+            ('registrations', 'Registrations',
+             '(SELECT COUNT(*) FROM event_registrations er WHERE er.event_id = e.id)'),
+            ('status', 'Status', """CASE WHEN date(e.event_date) = date('now', 'localtime') THEN 'Ongoing'
+                                        WHEN datetime(e.event_date) > datetime('now', 'localtime') THEN 'Upcoming'
+                                        ELSE 'Past' END"""),
+        ],
+        filters={'event_ids': 'e.id IN ({})', 'type': 'e.event_type = ?'},
+        order_by='e.event_date DESC',
+    ),
+    Export(
+        'registrations',
+        source="""event_registrations er
+                  JOIN events e ON er.event_id = e.id
+                  JOIN alumni_profiles ap ON er.user_id = ap.user_id
+                  JOIN users u ON er.user_id = u.id""",
+        columns=[
+            ('registration_id', 'Registration ID', 'er.id'),
+            ('event_id', 'Event ID', 'er.event_id'),
+            ('event_title', 'Event', 'e.title'),
+            ('name', 'Name', 'ap.name'),
+            ('email', 'Email', 'u.email'),
+            ('batch_year', 'Batch Year', 'ap.batch_year'),
+            ('department', 'Department', 'ap.department'),
+            ('company', 'Company', 'ap.company'),
+            ('status', 'Status', "COALESCE(er.status, 'approved')"),
+            ('attended', 'Attended', 'er.attended'),
+            ('admin_notes', 'Admin Notes', 'er.admin_notes'),
+            ('registered_at', 'Registered At', 'er.registered_at'),
+        ],
+        filters={'event_id': 'er.event_id = ?', 'event_ids': 'er.event_id IN ({})', 'status': 'er.status = ?'},
+        order_by='er.registered_at DESC',
+    ),
+    Export(
+        'alumni',
+        source='users u JOIN alumni_profiles ap ON ap.user_id = u.id',
+        columns=[
+            ('user_id', 'User ID', 'u.id'),
+            ('name', 'Name', 'ap.name'),
+            ('email', 'Email', 'u.email'),
+            ('batch_year', 'Batch Year', 'ap.batch_year'),
+            ('department', 'Department', 'ap.department'),
+            ('current_job', 'Current Job', 'ap.current_job'),
+            ('company', 'Company', 'ap.company'),
+            ('location', 'Location', 'ap.location'),
+            ('linkedin_url', 'LinkedIn', 'ap.linkedin_url'),
+            ('privacy_level', 'Privacy', 'ap.privacy_level'),
+            ('available_for_mentorship', 'Mentor', 'ap.available_for_mentorship'),
+            ('is_verified', 'Verified', 'u.is_verified'),
+            ('joined_at', 'Joined', 'u.created_at'),
+        ],
+        where="u.role = 'alumni'",
+        filters={'department': 'ap.department = ?', 'batch_year': 'ap.batch_year = ?',
+                 'verified': 'u.is_verified = ?'},
+        order_by='ap.name',
+    ),
+    Export(
+        'messages',
+        source="""messages m
+                  LEFT JOIN users s ON s.id = m.sender_id
+                  LEFT JOIN users r ON r.id = m.recipient_id""",
+        columns=[
+            ('id', 'Message ID', 'm.id'),
+            ('conversation_id', 'Conversation', 'm.conversation_id'),
+            ('sender', 'From', 's.email'),
+            ('recipient', 'To', 'r.email'),
+            ('subject', 'Subject', 'm.subject'),
+            ('content', 'Content', 'm.content'),
+            ('is_read', 'Read', 'm.is_read'),
+            ('created_at', 'Sent At', 'm.created_at'),
+        ],
+        filters={'since': 'm.created_at >= ?', 'until': 'm.created_at < ?',
+                 'user_id': '? IN (m.sender_id, m.recipient_id)'},
+        order_by='m.id',
+    ),
+    Export(
+        'activity',
+        source="""(SELECT 'forum_post' as type, author_id as user_id, title as detail, created_at
+                   FROM forum_posts
+                   UNION ALL
+                   SELECT 'forum_comment', author_id, substr(content, 1, 200), created_at
+                   FROM forum_comments
+                   UNION ALL
+                   SELECT 'message', sender_id, subject, created_at
+                   FROM messages
+                   UNION ALL
+                   SELECT 'event_registration', er.user_id, e.title, er.registered_at
+                   FROM event_registrations er JOIN events e ON e.id = er.event_id
+                   UNION ALL
+                   SELECT 'job_posting', posted_by, title, created_at
+                   FROM job_postings) a
+                  LEFT JOIN users u ON u.id = a.user_id""",
+        columns=[
+            ('type', 'Activity', 'a.type'),
+            ('user_id', 'User ID', 'a.user_id'),
+            ('email', 'Email', 'u.email'),
+            ('detail', 'Detail', 'a.detail'),
+            ('at', 'At', 'a.created_at'),
+        ],
+        filters={'since': 'a.created_at >= ?', 'until': 'a.created_at < ?', 'type': 'a.type = ?',
+                 'user_id': 'a.user_id = ?'},
+        order_by='a.created_at DESC',
+    ),
+]}
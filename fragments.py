@@ -0,0 +1,104 @@
+"""Cached template fragments.
+
+    {% cache 'past_events', 300, tags=['events'] %} ... {% endcache %}
+
+The rendered HTML of the block is kept for `ttl` seconds (Config default
+when omitted) per template and key. Writes call
+`fragment_cache.invalidate('events')` to drop every fragment carrying that
+tag. Pass the block's data as `Deferred(...)` so that the query only runs
+when the fragment actually has to be rendered.
+"""
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from cache import app_cache
+from config import Config
+from metrics import metrics
+
+
+class FragmentCache:
+    """Rendered fragments kept in the 'fragments' namespace of the app cache.
+
+    Tags are shared with the rest of the app cache, so
+    `app_cache.invalidate('events')` drops event fragments too.
+    """
+
+    def __init__(self, cache=None, ttl=None):
+        self.cache = (cache or app_cache).namespace('fragments', ttl or Config.FRAGMENT_CACHE_TTL)
+
+    def init_app(self, app):
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+
+    def render(self, key, render, ttl=None, tags=()):
+        """Cached HTML for `key`, rendering it once when missing"""
+        return self.cache.get_or_set(key, render, ttl, tags)
+
+    def invalidate(self, *tags):
+        self.cache.invalidate(*tags)
+
+    def clear(self):
+        self.cache.invalidate_namespace()
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        ttl, tags = nodes.Const(None), nodes.List([])
+        while parser.stream.skip_if('comma'):
+            if parser.stream.current.test('name:tags') and parser.stream.look().test('assign'):
+                next(parser.stream)
+                next(parser.stream)
+                tags = parser.parse_expression()
+            else:
+                ttl = parser.parse_expression()
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        args = [nodes.Const(parser.name), key, ttl, tags]
+        return nodes.CallBlock(self.call_method('_cached', args), [], [], body).set_lineno(lineno)
+
+    def _cached(self, template, key, ttl, tags, caller):
+        rendered = []
+
+        def render():
+            rendered.append(True)
+            return caller()
+
+        html = self.environment.fragment_cache.render(f'{template}:{key}', render, ttl, tags)
+        name = str(key).split(':', 1)[0]
+        metrics.increment(f'fragment_cache.{"miss" if rendered else "hit"}.{name}')
+        return html
+
+
+class Deferred:
+    """Query result evaluated on first use, e.g. Deferred(db.execute_query, sql)"""
+
+    def __init__(self, func, *args):
+        self._func, self._args = func, args
+        self._evaluated = False
+        self._value = None
+
+    @property
+    def value(self):
+        if not self._evaluated:
+            self._value = self._func(*self._args)
+            self._evaluated = True
+        return self._value
+
+    def __iter__(self):
+        return iter(self.value or ())
+
+    def __len__(self):
+        return len(self.value or ())
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __getitem__(self, item):
+        return self.value[item]
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,74 @@
+"""Production server settings:
+
+    gunicorn -c gunicorn.conf.py          # start
+    kill -HUP <master pid>                # graceful reload of code and workers
+    kill -TERM <master pid>               # graceful shutdown
+
+The master never imports the application. It applies schema changes once,
+in a separate process, before any worker starts (and again on every
+reload, so new code's tables exist before new workers serve requests).
+Workers then import the app themselves and open their own SQLite
+connections. With PRELOAD_APP=1 the app is instead imported once in the
+master and shared copy-on-write. That uses less memory but needs the
+post_fork set-up below, and only a full restart picks up new code.
+
+Each worker keeps some state in memory: the live status board, unread
+counts, calendar feeds, dashboard stats and the file access cache. Writes
+made in any worker reach the others through the change feed
+(changelog.py) within about CHANGE_FEED_POLL_INTERVAL, so any number of
+workers can run side by side.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
+# Every open event stream (the inbox unread count, the admin live status)
+# holds a thread; cap them at half of the threads so requests always find one
+os.environ.setdefault('SSE_MAX_STREAMS', str(max(1, threads // 2)))
+wsgi_app = 'wsgi:application'
+preload_app = os.environ.get('PRELOAD_APP') == '1'
+
+timeout = 60
+graceful_timeout = 30  # in-flight requests finish before a worker is replaced
+keepalive = 5
+max_requests = 5000  # recycle workers to bound memory growth
+max_requests_jitter = 500
+
+
+def _check_schema(server):
+    """Create/upgrade tables with the code currently on disk"""
+    if preload_app:
+        return  # importing the app in the master already did it
+    subprocess.run([sys.executable, '-c', 'from models import init_database; init_database()'],
+                   cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    os.environ['SCHEMA_READY'] = '1'  # inherited by the workers
+    server.log.info('Schema checked in the master (pid %s)', os.getpid())
+
+
+def on_starting(server):
+    _check_schema(server)
+
+
+def on_reload(server):
+    _check_schema(server)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import after_fork
+        after_fork()
+
+
+def worker_exit(server, worker):
+    """Let background job and change-feed threads finish their current batch"""
+    if 'app' in sys.modules:
+        from changelog import change_feed
+        from jobs import job_queue
+        job_queue.stop()
+        change_feed.stop()
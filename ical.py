@@ -0,0 +1,97 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+# Events have no end time; calendar clients get a fixed default duration
+DEFAULT_EVENT_DURATION = timedelta(hours=2)
+
+
+def _escape(value):
+    """Escape a TEXT value per RFC 5545"""
+    return (str(value or '').replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Fold content lines longer than 75 octets"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte character
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode('utf-8'))
+    return '\r\n '.join(parts)
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '').replace('T', ' '))
+
+
+def build_calendar(events, calendar_name, host):
+    """Render event rows (id, title, description, event_date, location, created_at) as iCalendar text"""
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Alumni Platform//Events//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(calendar_name)}',
+    ]
+    for event in events:
+        start = _as_datetime(event['event_date'])
+        # DTSTAMP comes from the row so unchanged data renders byte-identical
+        stamp = _as_datetime(event['created_at']) if event.get('created_at') else start
+        lines += [
+            'BEGIN:VEVENT',
+            f"UID:event-{event['id']}@{host}",
+            f"DTSTAMP:{stamp.strftime('%Y%m%dT%H%M%SZ')}",
+            f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}",
+            f"DTEND:{(start + DEFAULT_EVENT_DURATION).strftime('%Y%m%dT%H%M%S')}",
+            f"SUMMARY:{_escape(event['title'])}",
+            f"DESCRIPTION:{_escape(event.get('description'))}",
+            f"LOCATION:{_escape(event.get('location'))}",
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+class FeedCache:
+    """Rendered feeds and their strong ETags, rebuilt only after invalidation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._feeds = {}      # key -> (body, etag)
+        self._generation = 0  # bumped on every invalidation
+
+    def get(self, key, render):
+        """Return (body, etag) for `key`, calling render() only on a miss"""
+        with self._lock:
+            cached = self._feeds.get(key)
+            generation = self._generation
+        if cached is not None:
+            return cached
+        body = render()
+        cached = (body, hashlib.sha256(body.encode('utf-8')).hexdigest())
+        with self._lock:
+            # Don't keep a feed rendered from data that changed meanwhile
+            if generation == self._generation:
+                self._feeds[key] = cached
+        return cached
+
+    def invalidate(self, key=None):
+        """Drop one feed, or every feed when no key is given"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._feeds.clear()
+            else:
+                self._feeds.pop(key, None)
@@ -29,7 +29,7 @@ def main():
     if create_database():
         # Initialize tables and default data
         try:
-            init_database()
+            init_database(force=True)
             print("\nDatabase initialization completed successfully!")
             print("\nDefault admin credentials:")
             print("Email: admin@college.edu")
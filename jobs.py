@@ -0,0 +1,207 @@
+import json
+import os
+import sqlite3
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from config import Config
+
+
+class JobQueue:
+    """Durable background job queue stored in the application's SQLite database.
+
+    Jobs survive restarts, are claimed atomically by a pool of worker
+    threads, retried with exponential backoff and report their progress in
+    the `jobs` table. Handlers are plain functions registered per job kind:
+
+        @job_queue.handler('event_reminders')
+        def send_event_reminders(db, payload, progress):
+            ...
+
+    A retried job starts over unless its handler checkpoints: it finds the
+    last saved state in `progress.checkpoint` and saves a new one with
+    `save_checkpoint()` in the same transaction as the work it describes.
+    """
+
+    def __init__(self, db_path=None, workers=None, poll_interval=None, lease_seconds=300):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.workers = workers or Config.JOB_WORKERS
+        self.poll_interval = poll_interval or Config.JOB_POLL_INTERVAL
+        self.lease_seconds = lease_seconds
+        self._handlers = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker_id = f"{os.getpid()}"
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def handler(self, kind):
+        """Register the function that runs jobs of `kind`"""
+        def decorator(func):
+            self._handlers[kind] = func
+            return func
+        return decorator
+
+    def enqueue(self, kind, payload, idempotency_key=None, max_attempts=None, created_by=None):
+        """Queue a job and return its id.
+
+        When `idempotency_key` matches an existing job, that job's id is
+        returned and nothing new is queued.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f'No handler registered for job kind: {kind}')
+
+        connection = self._connect()
+        try:
+            cursor = connection.execute("""
+                INSERT OR IGNORE INTO jobs (kind, payload, idempotency_key, max_attempts, created_by)
+                VALUES (?, ?, ?, ?, ?)
+            """, (kind, json.dumps(payload), idempotency_key, max_attempts or Config.JOB_MAX_ATTEMPTS, created_by))
+            job_id = cursor.lastrowid if cursor.rowcount else None
+            if job_id is None:
+                job_id = connection.execute("SELECT id FROM jobs WHERE idempotency_key = ?",
+                                            (idempotency_key,)).fetchone()['id']
+        finally:
+            connection.close()
+
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def status(self, job_id):
+        """Job row as a dict (payload and result decoded), or None"""
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else None
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def start(self):
+        """Start the worker threads once per process"""
+        with self._lock:
+            if self._threads:
+                return
+            self._requeue_expired()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run_worker, name=f'job-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def after_fork(self):
+        """Forget the parent's threads in a forked child; they restart on demand"""
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker_id = f"{os.getpid()}"
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stopping.clear()
+
+    def _requeue_expired(self):
+        """Put back jobs whose worker died mid-run (e.g. the process restarted)"""
+        connection = self._connect()
+        try:
+            connection.execute("""
+                UPDATE jobs SET status = 'queued', locked_by = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'running' AND updated_at < datetime('now', ?)
+            """, (f'-{self.lease_seconds} seconds',))
+        finally:
+            connection.close()
+
+    def _claim(self, connection, worker_name):
+        """Atomically move the oldest ready job to 'running'"""
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("""
+                SELECT * FROM jobs
+                WHERE status = 'queued' AND run_after <= datetime('now')
+                ORDER BY id LIMIT 1
+            """).fetchone()
+            if row is not None:
+                connection.execute("""
+                    UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = ?,
+                                    updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (worker_name, row['id']))
+            connection.execute("COMMIT")
+            return row
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _run_worker(self):
+        from models import Database  # Handlers get their own connection per worker
+
+        worker_name = f'{self._worker_id}:{threading.current_thread().name}'
+        connection = self._connect()
+        db = Database()
+        while not self._stopping.is_set():
+            try:
+                job = self._claim(connection, worker_name)
+            except sqlite3.OperationalError:
+                job = None  # Database busy; try again on the next tick
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._execute(connection, db, job)
+        connection.close()
+
+    @staticmethod
+    def save_checkpoint(cursor, job_id, state):
+        """Record where job `job_id` would resume, inside the caller's transaction"""
+        cursor.execute("UPDATE jobs SET checkpoint = ? WHERE id = ?", (json.dumps(state), job_id))
+
+    def _execute(self, connection, db, job):
+        def progress(done, total=None):
+            connection.execute("""
+                UPDATE jobs SET progress = ?, total = COALESCE(?, total), updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (done, total, job['id']))
+        progress.job_id = job['id']
+        progress.checkpoint = json.loads(job['checkpoint']) if job['checkpoint'] else None
+
+        try:
+            result = self._handlers[job['kind']](db, json.loads(job['payload'] or 'null'), progress)
+            connection.execute("""
+                UPDATE jobs SET status = 'done', result = ?, locked_by = NULL, last_error = NULL,
+                                updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (json.dumps(result), job['id']))
+        except Exception as err:
+            attempts = job['attempts'] + 1
+            error = f'{err}\n{traceback.format_exc(limit=5)}'
+            if attempts >= job['max_attempts']:
+                connection.execute("""
+                    UPDATE jobs SET status = 'failed', last_error = ?, locked_by = NULL,
+                                    updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (error, job['id']))
+            else:
+                delay = min(Config.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), Config.JOB_RETRY_MAX_SECONDS)
+                run_after = (datetime.utcnow() + timedelta(seconds=delay)).strftime('%Y-%m-%d %H:%M:%S')
+                connection.execute("""
+                    UPDATE jobs SET status = 'queued', run_after = ?, last_error = ?, locked_by = NULL,
+                                    updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (run_after, error, job['id']))
+
+
+job_queue = JobQueue()
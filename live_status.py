@@ -0,0 +1,97 @@
+import json
+import threading
+from datetime import date
+
+
+class LiveStatusBoard:
+    """In-memory registration/attendance counters for today's events.
+
+    Counters are seeded with a single grouped query and then kept current by
+    the registration and check-in routes. Connected admin dashboards share the
+    board, so adding a viewer never costs an extra query.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._cond = threading.Condition()
+        self._counters = {}      # event_id -> {'id', 'title', 'current_attendees', 'attended'}
+        self._changed = {}       # event_id -> version of the last change
+        self._version = 0
+        self._loaded_for = None  # date the counters were seeded for
+
+    def _ensure_loaded(self):
+        """(Re)seed the counters when empty or when the day has rolled over"""
+        today = date.today()
+        if self._loaded_for == today:
+            return
+        rows = self.db.execute_query("""
+            SELECT e.id, e.title, COUNT(er.id) as current_attendees,
+                   COUNT(CASE WHEN er.attended = 1 THEN 1 END) as attended
+            FROM events e
+            LEFT JOIN event_registrations er ON e.id = er.event_id
+            WHERE date(e.event_date) = date('now')
+            GROUP BY e.id
+        """) or []
+        previous = set(self._counters)
+        self._counters = {row['id']: dict(row) for row in rows}
+        self._version += 1
+        # Every event (including ones that dropped off today's list) is a change
+        for event_id in previous | set(self._counters):
+            self._changed[event_id] = self._version
+        self._loaded_for = today
+        self._cond.notify_all()
+
+    def snapshot(self):
+        """Return (version, list of counters) for today's events"""
+        with self._cond:
+            self._ensure_loaded()
+            return self._version, [dict(c) for c in self._counters.values()]
+
+    def adjust(self, event_id, registrations=0, attended=0):
+        """Apply a registration or check-in delta for one event"""
+        with self._cond:
+            self._ensure_loaded()
+            counter = self._counters.get(event_id)
+            if counter is None:
+                return  # Not a live event today
+            counter['current_attendees'] = max(0, counter['current_attendees'] + registrations)
+            counter['attended'] = max(0, counter['attended'] + attended)
+            self._version += 1
+            self._changed[event_id] = self._version
+            self._cond.notify_all()
+
+    def invalidate(self):
+        """Force a reseed, e.g. after events are created, moved or deleted"""
+        with self._cond:
+            self._loaded_for = None
+            self._ensure_loaded()
+
+    def changes_since(self, version, timeout=None):
+        """Block until something changes after `version`.
+
+        Returns (new_version, deltas). Deltas are coalesced, so a burst of
+        writes reaches each viewer as one message. Removed events are sent
+        with `removed: True`.
+        """
+        with self._cond:
+            self._ensure_loaded()
+            self._cond.wait_for(lambda: self._version > version, timeout=timeout)
+            deltas = []
+            for event_id, changed_at in self._changed.items():
+                if changed_at > version:
+                    counter = self._counters.get(event_id)
+                    deltas.append(dict(counter) if counter else {'id': event_id, 'removed': True})
+            return self._version, deltas
+
+    def stream(self, heartbeat=15):
+        """Server-sent event generator: a full snapshot, then only deltas"""
+        version, events = self.snapshot()
+        yield f"event: snapshot\ndata: {json.dumps({'version': version, 'events': events})}\n\n"
+        while True:
+            new_version, deltas = self.changes_since(version, timeout=heartbeat)
+            if new_version == version:
+                yield ": keepalive\n\n"
+                continue
+            version = new_version
+            if deltas:
+                yield f"event: delta\ndata: {json.dumps({'version': version, 'events': deltas})}\n\n"
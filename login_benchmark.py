@@ -0,0 +1,105 @@
+"""Measure login throughput with bcrypt on the password pool.
+
+    python login_benchmark.py --users 200 --concurrency 16 --legacy
+
+Runs the real /login route through Flask's test client against a
+throwaway database. --legacy seeds unsalted SHA-256 hashes, so the run
+also measures upgrading them to bcrypt on first login; a second pass then
+logs the same users in against their new hashes.
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from config import Config
+
+
+def run_logins(app, emails, concurrency):
+    """Log every email in from `concurrency` threads; return (latencies, status counts, seconds)"""
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    pending = list(emails)
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if not pending:
+                    return
+                email = pending.pop()
+            started = time.perf_counter()
+            response = client.post('/login', data={'email': email, 'password': 'benchmark-password'})
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def report(label, latencies, statuses, seconds):
+    ordered = sorted(latencies)
+    print(f"{label}")
+    print(f"  logins:             {len(latencies)}")
+    print(f"  succeeded (302):    {statuses.get(302, 0)}")
+    print(f"  turned away (503):  {statuses.get(503, 0)}")
+    print(f"  elapsed:            {seconds:.2f}s")
+    print(f"  throughput:         {len(latencies) / seconds:.1f} logins/sec")
+    print(f"  latency p50:        {statistics.median(ordered) * 1000:.0f} ms")
+    print(f"  latency p95:        {ordered[int(len(ordered) * 0.95) - 1] * 1000:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--legacy', action='store_true', help='seed SHA-256 hashes to measure the upgrade')
+    parser.add_argument('--cost', type=int, help='bcrypt cost (default: auto-tuned)')
+    parser.add_argument('--max-pending', type=int, default=Config.PASSWORD_MAX_PENDING)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        Config.DATABASE_PATH = os.path.join(tmp, 'benchmark.db')
+        Config.PASSWORD_BCRYPT_COST = args.cost
+        Config.PASSWORD_MAX_PENDING = args.max_pending
+        Config.TEMPLATE_WARMUP = True
+        from app import create_app, db
+        app = create_app()
+        from passwords import password_hasher
+
+        emails = [f'alumni{i}@example.com' for i in range(args.users)]
+        if args.legacy:
+            stored = [hashlib.sha256(b'benchmark-password').hexdigest()] * len(emails)
+        else:
+            stored = [password_hasher.hash('benchmark-password')] * len(emails)  # same cost to verify
+        db.execute_many("INSERT INTO users (email, password, role, is_verified) VALUES (?, ?, 'alumni', 1)",
+                        list(zip(emails, stored)))
+
+        print(f"bcrypt cost:          {password_hasher.cost}")
+        print(f"hash workers:         {password_hasher.workers} (+{password_hasher.max_pending} waiting)")
+        print(f"client threads:       {args.concurrency}")
+        runs = [('first login (upgrading SHA-256)' if args.legacy else 'login', emails)]
+        if args.legacy:
+            runs.append(('second login (bcrypt)', emails))
+        for label, batch in runs:
+            report(label, *run_logins(app, batch, args.concurrency))
+        upgraded = db.execute_single("SELECT COUNT(*) as count FROM users WHERE password LIKE '$2%'")['count']
+        print(f"bcrypt hashes stored: {upgraded}/{len(emails) + 1}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
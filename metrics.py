@@ -0,0 +1,44 @@
+import threading
+
+
+class Metrics:
+    """In-process counters and value summaries, read by /admin/metrics.
+
+    Counters only go up (`increment`); `observe` keeps count/total/min/max
+    of a measured value such as a duration or a ratio.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._summaries = {}
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = {'count': 1, 'total': value, 'min': value, 'max': value}
+            else:
+                summary['count'] += 1
+                summary['total'] += value
+                summary['min'] = min(summary['min'], value)
+                summary['max'] = max(summary['max'], value)
+
+    def snapshot(self):
+        with self._lock:
+            summaries = {}
+            for name, summary in self._summaries.items():
+                summaries[name] = dict(summary, mean=summary['total'] / summary['count'])
+            return {'counters': dict(self._counters), 'summaries': summaries}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+metrics = Metrics()
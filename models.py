@@ -1,22 +1,52 @@
 import sqlite3
 from config import Config
-import hashlib
 from datetime import datetime
 import os
+import threading
+from contextlib import contextmanager
+import analytics
+import changelog
+from passwords import password_hasher
+
+# Bump whenever init_database() changes the schema; a database already at
+# this version (PRAGMA user_version) skips the DDL at startup
+SCHEMA_VERSION = 5
 
 class Database:
-    def __init__(self):
-        self.connection = None
-        self.connect()
+    def __init__(self, mark_origin=False):
+        self._connection = None  # opened on first use, so importing the app touches no files
+        self.mark_origin = mark_origin  # stamp this connection's changes (changelog.mark_origin)
+        self._connect_lock = threading.Lock()
+    
+    @property
+    def connection(self):
+        if self._connection is None:
+            with self._connect_lock:
+                if self._connection is None:
+                    self.connect()
+        return self._connection
     
     def connect(self):
         try:
             db_path = Config.DATABASE_PATH
-            self.connection = sqlite3.connect(db_path, check_same_thread=False)
-            self.connection.row_factory = sqlite3.Row  # This makes rows behave like dictionaries
+            connection = sqlite3.connect(db_path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row  # This makes rows behave like dictionaries
+            if self.mark_origin:
+                changelog.mark_origin(connection)
+            self._connection = connection
         except sqlite3.Error as err:
             print(f"Error connecting to SQLite: {err}")
     
+    def reconnect(self):
+        """Open a fresh connection in a forked child process.
+
+        The inherited connection is kept referenced but never used or closed:
+        SQLite connections must not be carried across fork().
+        """
+        self._inherited_connection = self._connection
+        self._connection = None
+        self._connect_lock = threading.Lock()
+    
     def execute_query(self, query, params=None):
         cursor = self.connection.cursor()
         try:
@@ -68,10 +98,90 @@ class Database:
             return None
         finally:
             cursor.close()
+    
+    def execute_insert(self, query, params=None):
+        """Run an INSERT and return the new row id"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, params or [])
+            self.connection.commit()
+            return cursor.lastrowid
+        except sqlite3.Error as err:
+            print(f"Error executing query: {err}")
+            self.connection.rollback()
+            return None
+        finally:
+            cursor.close()
+    
+    def execute_many(self, query, seq_of_params):
+        """Run one statement for many parameter rows in a single transaction"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(query, seq_of_params)
+            self.connection.commit()
+            return cursor.rowcount
+        except sqlite3.Error as err:
+            print(f"Error executing query: {err}")
+            self.connection.rollback()
+            return None
+        finally:
+            cursor.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Cursor whose statements are committed together, or rolled back on error"""
+        cursor = self.connection.cursor()
+        try:
+            yield cursor
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+    
+    def iter_query(self, query, params=None, batch_size=500):
+        """Yield rows as dicts, fetching `batch_size` at a time.
+
+        Runs on its own connection so a long export neither holds the shared
+        connection nor sees half of a concurrent write. Values are returned
+        as stored (no datetime conversion); format them in SQL instead.
+        """
+        connection = sqlite3.connect(Config.DATABASE_PATH, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        try:
+            cursor = connection.execute(query, params or [])
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            connection.close()
 
-def init_database():
-    """Initialize database tables"""
+    def add_column_if_missing(self, table, column, definition):
+        """Add a column to an existing table (CREATE TABLE IF NOT EXISTS won't)"""
+        columns = self.execute_query(f"PRAGMA table_info({table})") or []
+        if column not in {col['name'] for col in columns}:
+            self.execute_query(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def conversation_key(user_a, user_b):
+    """Conversation id shared by both participants of a message thread"""
+    user_a, user_b = sorted((int(user_a), int(user_b)))
+    return f"{user_a}:{user_b}"
+
+def schema_version(db):
+    return db.connection.execute("PRAGMA user_version").fetchone()[0]
+
+def init_database(force=False):
+    """Initialize database tables; skipped when the stored schema version is current"""
     db = Database()
+    if not force and schema_version(db) == SCHEMA_VERSION:
+        return False
+    
+    # WAL lets background job workers write while requests read
+    db.execute_query("PRAGMA journal_mode=WAL")
     
     # Users table
     db.execute_query("""
@@ -119,10 +229,35 @@ def init_database():
             event_type TEXT DEFAULT 'general',
             require_approval INTEGER DEFAULT 0,
             created_by INTEGER,
+            series_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (created_by) REFERENCES users(id),
+            FOREIGN KEY (series_id) REFERENCES event_series(id)
+        )
+    """)
+    db.add_column_if_missing('events', 'series_id', 'INTEGER REFERENCES event_series(id)')
+    
+    # Recurring event series (occurrences are materialized into events)
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS event_series (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            location TEXT,
+            capacity INTEGER,
+            event_type TEXT DEFAULT 'general',
+            require_approval INTEGER DEFAULT 0,
+            freq TEXT NOT NULL CHECK(freq IN ('daily', 'weekly', 'monthly')),
+            interval INTEGER DEFAULT 1,
+            start_date DATETIME NOT NULL,
+            until_date DATETIME,
+            occurrence_count INTEGER,
+            created_by INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (created_by) REFERENCES users(id)
         )
     """)
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_events_series ON events(series_id, event_date)")
     
     # Event registrations table
     db.execute_query("""
@@ -174,10 +309,49 @@ def init_database():
             content TEXT,
             is_read INTEGER DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            conversation_id TEXT,
             FOREIGN KEY (sender_id) REFERENCES users(id),
             FOREIGN KEY (recipient_id) REFERENCES users(id)
         )
     """)
+    db.add_column_if_missing('messages', 'conversation_id', 'TEXT')
+    # One conversation per participant pair; backfill rows written before threading
+    db.execute_query("""
+        UPDATE messages SET conversation_id = min(sender_id, recipient_id) || ':' || max(sender_id, recipient_id)
+        WHERE conversation_id IS NULL
+    """)
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_messages_recipient ON messages(recipient_id, created_at)")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages(sender_id, created_at)")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id, created_at)")
+    
+    # Event broadcasts delivered fan-out-on-read: one row per broadcast,
+    # read state per recipient
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER,
+            sender_id INTEGER,
+            subject TEXT,
+            content TEXT,
+            recipient_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (event_id) REFERENCES events(id),
+            FOREIGN KEY (sender_id) REFERENCES users(id)
+        )
+    """)
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS broadcast_reads (
+            broadcast_id INTEGER,
+            user_id INTEGER,
+            read_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (broadcast_id, user_id),
+            FOREIGN KEY (broadcast_id) REFERENCES broadcasts(id),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        ) WITHOUT ROWID
+    """)
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_broadcasts_event ON broadcasts(event_id, created_at)")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_registrations_user ON event_registrations(user_id, event_id)")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_registrations_event ON event_registrations(event_id, status)")
     
     # Job postings table
     db.execute_query("""
@@ -211,6 +385,60 @@ def init_database():
     
 
     
+    # Prefix search for the compose typeahead
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_profiles_name_lower ON alumni_profiles(lower(name))")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_users_email_lower ON users(lower(email))")
+    
+    # Dashboard counts by verification state and the pending-verification list
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_users_role_verified ON users(role, is_verified, created_at)")
+    
+    # Outgoing email (see outbox.py)
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            to_email TEXT NOT NULL,
+            subject TEXT,
+            body TEXT,
+            template TEXT,
+            status TEXT DEFAULT 'queued' CHECK(status IN ('queued', 'sending', 'sent', 'bounced', 'failed')),
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            claim_token TEXT,
+            claimed_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    """)
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, id)")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_outbox_claim ON outbox(claim_token)")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_outbox_recipient ON outbox(to_email, status)")
+    
+    # Background jobs (see jobs.py)
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT,
+            status TEXT DEFAULT 'queued' CHECK(status IN ('queued', 'running', 'done', 'failed')),
+            attempts INTEGER DEFAULT 0,
+            max_attempts INTEGER DEFAULT 5,
+            run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            progress INTEGER DEFAULT 0,
+            total INTEGER,
+            result TEXT,
+            last_error TEXT,
+            idempotency_key TEXT UNIQUE,
+            locked_by TEXT,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (created_by) REFERENCES users(id)
+        )
+    """)
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, run_after)")
+    # Where a retried job resumes (JSON, see JobQueue.save_checkpoint)
+    db.add_column_if_missing('jobs', 'checkpoint', 'TEXT')
+    
     # Announcements table
     db.execute_query("""
         CREATE TABLE IF NOT EXISTS announcements (
@@ -224,14 +452,47 @@ def init_database():
         )
     """)
     
-    # Create default admin user
-    admin_password = hashlib.sha256('admin123'.encode('utf-8')).hexdigest()
+    # Privacy lookups when serving a profile's picture or CV
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_profiles_picture ON alumni_profiles(profile_picture)")
+    db.execute_query("CREATE INDEX IF NOT EXISTS idx_profiles_cv ON alumni_profiles(cv_file)")
+    
+    # Uploaded file bodies by content hash (see storage.py)
     db.execute_query("""
-        INSERT OR IGNORE INTO users (email, password, role, is_verified) 
-        VALUES (?, ?, ?, ?)
-    """, ('admin@college.edu', admin_password, 'admin', 1))
+        CREATE TABLE IF NOT EXISTS stored_files (
+            digest TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            content_type TEXT,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    """)
+    
+    # Hourly/daily activity counts maintained by triggers (see analytics.py)
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS stats_rollups (
+            metric TEXT NOT NULL,
+            bucket TEXT NOT NULL CHECK(bucket IN ('hour', 'day')),
+            period TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (metric, bucket, period)
+        ) WITHOUT ROWID
+    """)
+    analytics.install(db)
+    
+    # Change log fed by triggers on the core tables (see changelog.py)
+    changelog.install(db)
+    
+    # Create default admin user (bcrypt is slow, so only hash when it's missing)
+    if db.execute_single("SELECT id FROM users WHERE email = ?", ('admin@college.edu',)) is None:
+        admin_password = password_hasher.hash('admin123')
+        db.execute_query("""
+            INSERT OR IGNORE INTO users (email, password, role, is_verified) 
+            VALUES (?, ?, ?, ?)
+        """, ('admin@college.edu', admin_password, 'admin', 1))
     
+    db.execute_query(f"PRAGMA user_version = {SCHEMA_VERSION}")
     print("Database initialized successfully!")
+    return True
 
 if __name__ == "__main__":
     init_database()
\ No newline at end of file
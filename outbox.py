@@ -0,0 +1,273 @@
+import os
+import queue
+import smtplib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from config import Config
+
+_templates = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')),
+    autoescape=select_autoescape(['html']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+
+def render_email(template, **context):
+    """Render templates/email/<template>.txt into (subject, body).
+
+    The first line of the template is the subject, the rest is the body.
+    """
+    subject, _, body = _templates.get_template(f'{template}.txt').render(**context).partition('\n')
+    return subject.strip(), body.lstrip('\n')
+
+
+def queue_emails(db, emails):
+    """Queue (to_email, subject, body, template) rows with one executemany.
+
+    Addresses that hard-bounced before are skipped.
+    """
+    return db.execute_many("""
+        INSERT INTO outbox (to_email, subject, body, template)
+        SELECT ?1, ?2, ?3, ?4
+        WHERE NOT EXISTS (SELECT 1 FROM outbox WHERE to_email = ?1 AND status = 'bounced')
+    """, emails)
+
+
+class RateLimiter:
+    """Token bucket shared by every sending thread"""
+
+    def __init__(self, per_second):
+        self.per_second = per_second
+        self._tokens = per_second
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.per_second:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.per_second, self._tokens + (now - self._updated) * self.per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.per_second
+            time.sleep(wait)
+
+
+class SMTPConnectionPool:
+    """Reusable, logged-in SMTP connections.
+
+    Connections are returned to the pool after use and re-checked with NOOP
+    when they have been idle; one that errors is closed and replaced.
+    """
+
+    def __init__(self, host, port, size=4, username=None, password=None, use_tls=False,
+                 timeout=30, idle_check_seconds=30, max_messages_per_connection=500):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connections_opened = 0
+
+    def _open(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        self.connections_opened += 1
+        return {'smtp': smtp, 'sent': 0, 'last_used': time.monotonic()}
+
+    def _is_usable(self, conn):
+        if conn['sent'] >= self.max_messages_per_connection:
+            return False
+        if time.monotonic() - conn['last_used'] < self.idle_check_seconds:
+            return True
+        try:
+            return conn['smtp'].noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn['smtp'].quit()
+        except Exception:
+            conn['smtp'].close()
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        conn = None
+        try:
+            while conn is None:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._open()
+                    break
+                if not self._is_usable(conn):
+                    self._close(conn)
+                    conn = None
+            yield conn
+            conn['last_used'] = time.monotonic()
+            self._idle.put(conn)
+        except BaseException:
+            # Don't hand a connection in an unknown state to the next caller
+            if conn is not None:
+                conn['smtp'].close()
+            raise
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def _build_message(row):
+    message = EmailMessage()
+    message['From'] = Config.MAIL_FROM
+    message['To'] = row['to_email']
+    message['Subject'] = row['subject']
+    message['Message-ID'] = f"<outbox-{row['id']}@{Config.MAIL_FROM.split('@')[-1]}>"
+    message.set_content(row['body'] or '')
+    return message
+
+
+class Outbox:
+    """Delivers queued rows from the outbox table over pooled SMTP connections"""
+
+    def __init__(self, pool=None, rate_limit=None, batch_size=None):
+        self.pool = pool
+        self.rate_limiter = RateLimiter(rate_limit if rate_limit is not None else Config.SMTP_RATE_LIMIT)
+        self.batch_size = batch_size or Config.SMTP_BATCH_SIZE
+
+    def _claim(self, db, limit):
+        """Mark up to `limit` queued rows as ours and return them.
+        
+        Rows left in 'sending' by a crashed process are reclaimed after ten minutes.
+        """
+        token = uuid.uuid4().hex
+        db.execute_query("""
+            UPDATE outbox SET status = 'sending', claim_token = ?, claimed_at = CURRENT_TIMESTAMP,
+                              attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM outbox
+                WHERE status = 'queued'
+                   OR (status = 'sending' AND claimed_at < datetime('now', '-10 minutes'))
+                ORDER BY id LIMIT ?
+            )
+        """, (token, limit))
+        return db.execute_query("SELECT * FROM outbox WHERE claim_token = ? ORDER BY id", (token,)) or []
+
+    def _send_batch(self, rows):
+        """Send rows on one pooled connection; return [(id, status, error)]"""
+        outcomes = []
+        if self.pool is None:
+            # No SMTP server configured: log instead of sending
+            for row in rows:
+                print(f"Email to {row['to_email']}: {row['subject']}")
+                outcomes.append((row['id'], 'sent', None))
+            return outcomes
+
+        try:
+            with self.pool.connection() as conn:
+                for row in rows:
+                    self.rate_limiter.acquire()
+                    try:
+                        conn['smtp'].send_message(_build_message(row))
+                        conn['sent'] += 1
+                        outcomes.append((row['id'], 'sent', None))
+                    except smtplib.SMTPRecipientsRefused as err:
+                        # Only a 5xx at RCPT is a hard bounce (and suppresses the address)
+                        permanent = all(500 <= code < 600 for code, _ in err.recipients.values())
+                        outcomes.append((row['id'], 'bounced' if permanent else 'queued', str(err.recipients)))
+                    except smtplib.SMTPSenderRefused:
+                        raise  # the relay refuses us, not the recipient: retry the whole batch later
+                    except smtplib.SMTPResponseException as err:
+                        # e.g. a rejected message body: give up on this message, keep the address
+                        status = 'failed' if 500 <= err.smtp_code < 600 else 'queued'
+                        outcomes.append((row['id'], status, f'{err.smtp_code} {err.smtp_error!r}'))
+        except (smtplib.SMTPException, OSError) as err:
+            # Connection-level failure: everything not yet sent goes back to the queue
+            done = {outcome[0] for outcome in outcomes}
+            outcomes += [(row['id'], 'queued', str(err)) for row in rows if row['id'] not in done]
+        return outcomes
+
+    def flush(self, db, progress=None, limit=None):
+        """Send queued email until the outbox is empty (or `limit` rows were claimed)"""
+        totals = {'sent': 0, 'bounced': 0, 'queued': 0, 'failed': 0}
+        started = time.perf_counter()
+        claimed = 0
+        workers = self.pool.size if self.pool else 1
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while limit is None or claimed < limit:
+                rows = self._claim(db, self.batch_size * workers)
+                if not rows:
+                    break
+                claimed += len(rows)
+                batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+                outcomes = [o for batch in executor.map(self._send_batch, batches) for o in batch]
+                self._record(db, outcomes, {row['id']: row['attempts'] for row in rows})
+                round_totals = {}
+                for _, status, _ in outcomes:
+                    round_totals[status] = round_totals.get(status, 0) + 1
+                    totals[status] = totals.get(status, 0) + 1
+                if progress:
+                    progress(totals['sent'] + totals['bounced'] + totals['failed'])
+                if round_totals.get('queued') == len(outcomes):
+                    break  # Server unavailable: leave the rest for a later flush
+
+        elapsed = time.perf_counter() - started
+        totals['seconds'] = round(elapsed, 3)
+        totals['messages_per_second'] = round(totals['sent'] / elapsed, 1) if elapsed else None
+        return totals
+
+    @staticmethod
+    def _record(db, outcomes, attempts):
+        rows = []
+        for index, (outbox_id, status, error) in enumerate(outcomes):
+            if status == 'queued' and attempts[outbox_id] >= Config.MAIL_MAX_ATTEMPTS:
+                status = 'failed'
+                outcomes[index] = (outbox_id, status, error)
+            rows.append((status, error, status, outbox_id))
+        db.execute_many("""
+            UPDATE outbox SET status = ?, last_error = ?, claim_token = NULL,
+                              sent_at = CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP END
+            WHERE id = ?
+        """, rows)
+
+
+def default_outbox():
+    """Outbox configured from Config; logs to stdout when SMTP_HOST is unset"""
+    pool = None
+    if Config.SMTP_HOST:
+        pool = SMTPConnectionPool(Config.SMTP_HOST, Config.SMTP_PORT, size=Config.SMTP_POOL_SIZE,
+                                  username=Config.SMTP_USERNAME, password=Config.SMTP_PASSWORD,
+                                  use_tls=Config.SMTP_USE_TLS)
+    return Outbox(pool)
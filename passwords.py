@@ -0,0 +1,159 @@
+"""Password hashing with bcrypt on a bounded worker pool.
+
+bcrypt is deliberately slow, so hashing and checking run on a small
+thread pool (bcrypt releases the GIL while it works) instead of tying up
+request threads. At most PASSWORD_MAX_PENDING operations may wait for the
+pool; beyond that `PasswordHasherBusy` is raised immediately so a login
+storm gets a fast "try again" instead of an ever-growing queue. Bulk
+hashing for imports runs on a separate pool of PASSWORD_IMPORT_WORKERS
+low-priority threads, so an import never takes the login pool's threads.
+
+Hashes from before bcrypt (unsalted SHA-256 hex digests) still verify,
+and `verify()` reports them, as well as bcrypt hashes below the current
+cost, as needing a rehash; `rehash()` then produces the upgrade to store.
+The cost is tuned once per process to the largest that stays within
+PASSWORD_HASH_TARGET_MS, unless PASSWORD_BCRYPT_COST fixes it.
+"""
+
+import hashlib
+import hmac
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from config import Config
+from metrics import metrics
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hash operations are already waiting for the pool"""
+
+
+def is_legacy_hash(stored):
+    return len(stored or '') == 64 and all(c in '0123456789abcdef' for c in stored)
+
+
+def bcrypt_cost(stored):
+    """Cost factor of a '$2b$12$...' hash"""
+    return int(stored.split('$')[2])
+
+
+def calibrate(target_ms=None, min_cost=None, max_cost=None):
+    """Largest bcrypt cost whose hash takes at most `target_ms` on this machine"""
+    target_ms = target_ms or Config.PASSWORD_HASH_TARGET_MS
+    min_cost = min_cost or Config.PASSWORD_MIN_COST
+    max_cost = max_cost or Config.PASSWORD_MAX_COST
+    started = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(min_cost))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # Each extra round doubles the work
+    extra = math.floor(math.log2(target_ms / elapsed_ms)) if elapsed_ms < target_ms else 0
+    return max(min_cost, min(max_cost, min_cost + extra))
+
+
+def _lower_priority():
+    """Run the calling thread at a lower CPU priority (Linux threads can be niced individually)"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), Config.PASSWORD_IMPORT_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+class PasswordHasher:
+    def __init__(self, workers=None, max_pending=None, cost=None, import_workers=None):
+        self.workers = workers or Config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+        self.import_workers = import_workers or Config.PASSWORD_IMPORT_WORKERS
+        self.max_pending = Config.PASSWORD_MAX_PENDING if max_pending is None else max_pending
+        self._cost = cost or Config.PASSWORD_BCRYPT_COST
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._executors = {}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    @property
+    def cost(self):
+        if self._cost is None:
+            with self._lock:
+                if self._cost is None:
+                    self._cost = calibrate()
+        return self._cost
+
+    def _pool(self, name='bcrypt'):
+        with self._lock:
+            if self._pid != os.getpid():  # not inherited across fork
+                self._executors = {}
+                self._pid = os.getpid()
+            if name not in self._executors:
+                if name == 'bcrypt-import':
+                    executor = ThreadPoolExecutor(self.import_workers, thread_name_prefix=name,
+                                                  initializer=_lower_priority)
+                else:
+                    executor = ThreadPoolExecutor(self.workers, thread_name_prefix=name)
+                self._executors[name] = executor
+            return self._executors[name]
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            metrics.increment('passwords.rejected')
+            raise PasswordHasherBusy('Too many sign-ins at once, please try again in a moment')
+        try:
+            started = time.perf_counter()
+            result = self._pool().submit(func, *args).result()
+            metrics.observe('passwords.wait_and_hash_ms', (time.perf_counter() - started) * 1000)
+            return result
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(self._hash, password, self.cost)
+
+    def hash_many(self, passwords):
+        """Hashes for many passwords (imports), on the import pool rather than the login pool"""
+        cost = self.cost
+        started = time.perf_counter()
+        hashes = list(self._pool('bcrypt-import').map(lambda password: self._hash(password, cost), passwords))
+        metrics.observe('passwords.import_batch_ms', (time.perf_counter() - started) * 1000)
+        return hashes
+
+    @staticmethod
+    def _hash(password, cost):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(cost)).decode('ascii')
+
+    def verify(self, password, stored):
+        """(valid, needs_rehash) for `password` against a stored hash"""
+        if not stored:
+            return False, False
+        if is_legacy_hash(stored):
+            digest = hashlib.sha256(password.encode('utf-8')).hexdigest()
+            return hmac.compare_digest(digest, stored), True
+        valid = self._run(bcrypt.checkpw, password.encode('utf-8'), stored.encode('ascii'))
+        return valid, valid and bcrypt_cost(stored) < self.cost
+
+    def rehash(self, password):
+        """New hash for a verified password, or None when the pool is busy (retried next login)"""
+        try:
+            hashed = self.hash(password)
+        except PasswordHasherBusy:
+            return None
+        metrics.increment('passwords.upgraded')
+        return hashed
+
+    def dummy_verify(self, password):
+        """Spend the time of a real check, so unknown emails aren't told apart by timing"""
+        self._run(bcrypt.checkpw, password.encode('utf-8'), _dummy_hash(self.cost))
+
+
+_dummy_hashes = {}
+
+
+def _dummy_hash(cost):
+    if cost not in _dummy_hashes:
+        _dummy_hashes[cost] = bcrypt.hashpw(b'not a password', bcrypt.gensalt(cost))
+    return _dummy_hashes[cost]
+
+
+password_hasher = PasswordHasher()
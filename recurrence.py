@@ -0,0 +1,68 @@
+import calendar
+from datetime import datetime, timedelta
+
+FREQUENCIES = ('daily', 'weekly', 'monthly')
+
+
+def parse_event_datetime(value):
+    """Parse the date formats used for event_date (form input and SQLite)"""
+    if isinstance(value, datetime):
+        return value
+    value = value.strip().replace('Z', '')
+    for fmt in ('%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return datetime.fromisoformat(value)
+
+
+def _add_months(start, months):
+    """Same day-of-month `months` later, or None if that day does not exist"""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    if start.day > calendar.monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+
+def occurrences(start, freq, interval=1, until=None, count=None, limit=None):
+    """Lazily yield the datetimes of an RRULE-style daily/weekly/monthly rule.
+
+    Stops at `until` (inclusive), after `count` occurrences, or after `limit`
+    occurrences as a safety cap, whichever comes first. Like RFC 5545, a
+    monthly rule on the 31st skips months that have no 31st.
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f'Unsupported frequency: {freq}')
+    if interval < 1:
+        raise ValueError('Interval must be at least 1')
+
+    produced = 0
+    step = 0
+    while True:
+        if freq == 'daily':
+            current = start + timedelta(days=step * interval)
+        elif freq == 'weekly':
+            current = start + timedelta(weeks=step * interval)
+        else:
+            current = _add_months(start, step * interval)
+        step += 1
+
+        if current is None:
+            continue
+        if until is not None and current > until:
+            return
+        yield current
+        produced += 1
+        if (count is not None and produced >= count) or (limit is not None and produced >= limit):
+            return
+
+
+def occurrences_between(start, freq, window_start, window_end, interval=1, until=None, count=None):
+    """Yield only the occurrences that fall inside [window_start, window_end]"""
+    if until is None or window_end < until:
+        until = window_end
+    for current in occurrences(start, freq, interval, until=until, count=count):
+        if current >= window_start:
+            yield current
@@ -0,0 +1,136 @@
+"""Measure outbox throughput against a local in-process SMTP server.
+
+    python smtp_benchmark.py --messages 2000 --pool-size 4 --batch-size 100
+
+Nothing leaves the machine: the server accepts every message and only
+counts it. Use --bounce-every to make it refuse some recipients.
+"""
+
+import argparse
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+from config import Config
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to receive mail from smtplib"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        recipients = 0
+        self.reply('220 localhost benchmark SMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                recipients = 0
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                with server.lock:
+                    server.recipients_seen += 1
+                    refuse = server.bounce_every and server.recipients_seen % server.bounce_every == 0
+                if refuse:
+                    self.reply('550 No such user')
+                else:
+                    recipients += 1
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                if not recipients:
+                    self.reply('554 No valid recipients')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                with server.lock:
+                    server.messages_received += 1
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                recipients = 0
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, bounce_every=0):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.bounce_every = bounce_every
+        self.recipients_seen = 0
+        self.messages_received = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--pool-size', type=int, default=Config.SMTP_POOL_SIZE)
+    parser.add_argument('--batch-size', type=int, default=Config.SMTP_BATCH_SIZE)
+    parser.add_argument('--rate-limit', type=float, default=0, help='messages per second, 0 = unlimited')
+    parser.add_argument('--bounce-every', type=int, default=0, help='refuse every Nth recipient')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The outbox and models modules read Config.DATABASE_PATH at use time
+        Config.DATABASE_PATH = os.path.join(tmp, 'benchmark.db')
+        from models import Database, init_database
+        from outbox import Outbox, SMTPConnectionPool, queue_emails
+
+        init_database()
+        db = Database()
+        queue_emails(db, [(f'alumni{i}@example.com', f'Benchmark message {i}', 'Hello from the benchmark.\n',
+                           'benchmark') for i in range(args.messages)])
+
+        with LocalSMTPServer(bounce_every=args.bounce_every) as server:
+            pool = SMTPConnectionPool('127.0.0.1', server.port, size=args.pool_size)
+            outbox = Outbox(pool, rate_limit=args.rate_limit, batch_size=args.batch_size)
+            totals = outbox.flush(db)
+            pool.close_all()
+            time.sleep(0.1)  # let the server finish counting
+
+        print(f"queued:               {args.messages}")
+        print(f"sent:                 {totals['sent']}")
+        print(f"bounced:              {totals['bounced']}")
+        print(f"deferred:             {totals['queued']}")
+        print(f"server received:      {server.messages_received}")
+        print(f"connections opened:   {pool.connections_opened}")
+        print(f"elapsed:              {totals['seconds']}s")
+        print(f"throughput:           {totals['messages_per_second']} msgs/sec")
+    return 0 if totals['sent'] == server.messages_received else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Measure import and start-up time of the app, and check that importing it has no side effects.
+
+    python startup_benchmark.py --runs 5 --import-budget-ms 500 --startup-budget-ms 250
+
+Each run is a fresh interpreter in a scratch directory, so nothing is
+shared between runs except the database the first (cold) run creates.
+Importing `app` must not create any file there; create_app() against a
+database whose schema version is current must skip the DDL. Exits with
+status 1 when a check fails or a median is over its budget, so CI can run
+it as-is.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+IMPORT_BUDGET_MS = 500
+STARTUP_BUDGET_MS = 250
+
+_PROBE = """
+import json, os, time
+before = set(os.listdir('.'))
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+created = sorted(set(os.listdir('.')) - before)
+app.create_app()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'startup_ms': (time.perf_counter() - imported) * 1000,
+                  'created_on_import': created}))
+"""
+
+
+def probe(workdir):
+    """Run one fresh interpreter in `workdir`; return its timings"""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)), PASSWORD_BCRYPT_COST='4')
+    result = subprocess.run([sys.executable, '-c', _PROBE], cwd=workdir, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--startup-budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        cold = probe(workdir)  # creates the schema
+        runs = [probe(workdir) for _ in range(args.runs)]
+
+    import_ms = statistics.median(run['import_ms'] for run in [cold] + runs)
+    startup_ms = statistics.median(run['startup_ms'] for run in runs)
+    print(f"import app (median):      {import_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"create_app, first run:    {cold['startup_ms']:.0f} ms (creates the schema)")
+    print(f"create_app (median):      {startup_ms:.0f} ms (budget {args.startup_budget_ms:.0f} ms)")
+
+    for run in [cold] + runs:
+        if run['created_on_import']:
+            failures.append(f"importing app created {', '.join(run['created_on_import'])}")
+            break
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import took {import_ms:.0f} ms, over the {args.import_budget_ms:.0f} ms budget")
+    if startup_ms > args.startup_budget_ms:
+        failures.append(f"create_app took {startup_ms:.0f} ms, over the {args.startup_budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,854 @@
+    // Global variables
+    let currentFilter = 'all';
+    let selectedEvents = new Set();
+    let selectedRegistrations = new Set();
+
+    // Global variables
+    let currentFilter = 'all';
+    let selectedEvents = new Set();
+
+    // Initialize page
+    document.addEventListener('DOMContentLoaded', function () {
+        initializeEventManagement();
+        setupDropdowns();
+        setupEventForm();
+        setupRegistrationSelection();
+    });
+
+    function initializeEventManagement() {
+        // Show all events by default
+        const allTab = document.querySelector('.filter-tab[data-filter="all"]');
+        if (allTab) {
+            switchTab(allTab, 'all');
+        } else {
+            // Fallback: show all events section directly
+            const allEventsSection = document.getElementById('all-events');
+            if (allEventsSection) {
+                allEventsSection.style.display = 'block';
+            }
+        }
+
+        // Setup event selection
+        setupEventSelection();
+
+        // Live event counts: pushed by the server, polling only as a fallback
+        subscribeLiveEvents();
+    }
+
+    // Tab Management
+    function switchTab(tabElement, filter) {
+        console.log('Switching to tab:', filter);
+
+        // Update active tab
+        document.querySelectorAll('.filter-tab').forEach(tab => tab.classList.remove('active'));
+        if (tabElement) {
+            tabElement.classList.add('active');
+        }
+
+        // Show/hide event categories
+        document.querySelectorAll('.event-category').forEach(category => {
+            category.style.display = 'none';
+        });
+
+        const targetCategory = document.getElementById(filter + '-events');
+        console.log('Target category element:', targetCategory);
+
+        if (targetCategory) {
+            targetCategory.style.display = 'block';
+            console.log('Showing category:', filter);
+        } else {
+            console.log('Target category not found for filter:', filter);
+        }
+
+        currentFilter = filter;
+        clearSelection();
+    }
+
+    // Event Selection
+    function setupEventSelection() {
+        document.addEventListener('change', function (e) {
+            if (e.target.classList.contains('event-select')) {
+                const eventId = e.target.value;
+                if (e.target.checked) {
+                    selectedEvents.add(eventId);
+                } else {
+                    selectedEvents.delete(eventId);
+                }
+                updateBulkActionsBar();
+            }
+        });
+    }
+
+    function updateBulkActionsBar() {
+        const bulkBar = document.getElementById('bulkActionsBar');
+        const countElement = document.getElementById('selectedCount');
+
+        if (selectedEvents.size > 0) {
+            bulkBar.style.display = 'flex';
+            countElement.textContent = selectedEvents.size;
+        } else {
+            bulkBar.style.display = 'none';
+        }
+    }
+
+    function toggleBulkActions() {
+        const bulkBar = document.getElementById('bulkActionsBar');
+        if (bulkBar.style.display === 'none' || !bulkBar.style.display) {
+            bulkBar.style.display = 'flex';
+        } else {
+            bulkBar.style.display = 'none';
+            clearSelection();
+        }
+    }
+
+    function clearSelection() {
+        selectedEvents.clear();
+        document.querySelectorAll('.event-select').forEach(checkbox => {
+            checkbox.checked = false;
+        });
+        updateBulkActionsBar();
+    }
+
+    // Search and Filter
+    function filterEvents() {
+        const searchTerm = document.getElementById('eventSearch').value.toLowerCase();
+        const eventItems = document.querySelectorAll('.event-item');
+
+        eventItems.forEach(item => {
+            const title = item.querySelector('h3').textContent.toLowerCase();
+            const description = item.querySelector('.event-description').textContent.toLowerCase();
+
+            if (title.includes(searchTerm) || description.includes(searchTerm)) {
+                item.style.display = 'flex';
+            } else {
+                item.style.display = 'none';
+            }
+        });
+    }
+
+    function sortEvents() {
+        const sortBy = document.getElementById('sortBy').value;
+        const container = document.querySelector('#' + currentFilter + '-events');
+        if (!container) return;
+
+        const items = Array.from(container.querySelectorAll('.event-item'));
+
+        items.sort((a, b) => {
+            switch (sortBy) {
+                case 'date_asc':
+                    return new Date(a.dataset.eventDate) - new Date(b.dataset.eventDate);
+                case 'date_desc':
+                    return new Date(b.dataset.eventDate) - new Date(a.dataset.eventDate);
+                case 'title':
+                    return a.querySelector('h3').textContent.localeCompare(b.querySelector('h3').textContent);
+                case 'registrations':
+                    const aCount = parseInt(a.querySelector('.event-meta span:last-child').textContent.match(/\d+/)[0]);
+                    const bCount = parseInt(b.querySelector('.event-meta span:last-child').textContent.match(/\d+/)[0]);
+                    return bCount - aCount;
+                default:
+                    return 0;
+            }
+        });
+
+        items.forEach(item => container.appendChild(item));
+    }
+
+    // Event Management Functions
+    function openCreateEventModal() {
+        document.getElementById('modalTitle').textContent = 'Create New Event';
+        document.getElementById('submitText').textContent = 'Create Event';
+        document.getElementById('eventForm').reset();
+        document.getElementById('eventId').value = '';
+        document.getElementById('repeatGroup').style.display = '';
+        document.getElementById('applyToSeriesLabel').style.display = 'none';
+        toggleRepeatOptions();
+        document.getElementById('eventModal').style.display = 'block';
+    }
+
+    function toggleRepeatOptions() {
+        const repeating = document.getElementById('eventRepeat').value !== 'none';
+        document.querySelectorAll('.repeat-option').forEach(el => {
+            el.style.display = repeating ? '' : 'none';
+        });
+    }
+
+    function editEvent(eventId) {
+        // Fetch event data and populate form
+        fetch(`/admin/events/${eventId}/edit`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    document.getElementById('modalTitle').textContent = 'Edit Event';
+                    document.getElementById('submitText').textContent = 'Update Event';
+
+                    // Populate form fields
+                    document.getElementById('eventId').value = data.event.id;
+                    document.getElementById('eventTitle').value = data.event.title;
+                    document.getElementById('eventDescription').value = data.event.description;
+                    document.getElementById('eventDate').value = data.event.event_date;
+                    document.getElementById('eventLocation').value = data.event.location || '';
+                    document.getElementById('eventCapacity').value = data.event.capacity || '';
+                    document.getElementById('eventType').value = data.event.event_type || 'general';
+
+                    // Recurrence is chosen at creation; edits can fan out to the series
+                    document.getElementById('eventRepeat').value = 'none';
+                    toggleRepeatOptions();
+                    document.getElementById('repeatGroup').style.display = 'none';
+                    document.getElementById('applyToSeriesLabel').style.display = data.event.series_id ? '' : 'none';
+
+                    document.getElementById('eventModal').style.display = 'block';
+                } else {
+                    showNotification('Error loading event data', 'error');
+                }
+            })
+            .catch(error => {
+                showNotification('Error loading event data', 'error');
+            });
+    }
+
+    function closeEventModal() {
+        document.getElementById('eventModal').style.display = 'none';
+    }
+
+    function setupEventForm() {
+        document.getElementById('eventForm').addEventListener('submit', function (e) {
+            e.preventDefault();
+
+            const formData = new FormData(this);
+            const eventId = document.getElementById('eventId').value;
+            const isEdit = eventId !== '';
+
+            const url = isEdit ? `/admin/events/${eventId}/update` : '/admin/events/create';
+            const method = 'POST';
+
+            const submitBtn = this.querySelector('button[type="submit"]');
+            const originalText = submitBtn.innerHTML;
+
+            submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> ' + (isEdit ? 'Updating...' : 'Creating...');
+            submitBtn.disabled = true;
+
+            fetch(url, {
+                method: method,
+                body: formData
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification(data.message, 'success');
+                        closeEventModal();
+                        setTimeout(() => location.reload(), 1500);
+                    } else {
+                        showNotification(data.message || 'Error saving event', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error saving event', 'error');
+                })
+                .finally(() => {
+                    submitBtn.innerHTML = originalText;
+                    submitBtn.disabled = false;
+                });
+        });
+    }
+
+    // Registration Management
+    let registrationsEventId = null;
+
+    function viewRegistrations(eventId) {
+        registrationsEventId = eventId;
+        fetch(`/admin/events/${eventId}/registrations`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    document.getElementById('registrationModalTitle').textContent = `${data.event_title} - Registrations`;
+                    document.getElementById('registrationCount').textContent = `${data.registrations.length} registrations`;
+
+                    // Populate registrations list
+                    const listContainer = document.getElementById('registrationsList');
+                    listContainer.innerHTML = generateRegistrationsList(data.registrations);
+
+                    document.getElementById('registrationModal').style.display = 'block';
+                } else {
+                    showNotification('Error loading registrations', 'error');
+                }
+            })
+            .catch(error => {
+                showNotification('Error loading registrations', 'error');
+            });
+    }
+
+    function generateRegistrationsList(registrations) {
+        if (registrations.length === 0) {
+            return `
+            <div class="empty-state">
+                <div class="empty-icon">
+                    <i class="fas fa-users"></i>
+                </div>
+                <h3>No Registrations Yet</h3>
+                <p>No alumni have registered for this event yet.</p>
+            </div>
+        `;
+        }
+
+        return registrations.map(reg => `
+        <div class="registration-item" data-registration-id="${reg.id}">
+            <div class="registration-checkbox">
+                <input type="checkbox" class="registration-select" value="${reg.id}">
+            </div>
+            <div class="registration-info">
+                <h4>${reg.name || 'Unknown Name'}</h4>
+                <p>
+                    <i class="fas fa-envelope"></i> ${reg.email || 'No email'} • 
+                    <i class="fas fa-graduation-cap"></i> ${reg.batch_year || 'Unknown'} • 
+                    <i class="fas fa-building"></i> ${reg.department || 'Unknown Department'}
+                </p>
+                ${reg.company ? `<p><i class="fas fa-briefcase"></i> ${reg.company}</p>` : ''}
+                <small><i class="fas fa-calendar"></i> Registered: ${reg.registered_at || 'Unknown date'}</small>
+            </div>
+            <div class="registration-status">
+                <span class="status-badge ${(reg.registration_status || reg.status || 'approved').toLowerCase()}">
+                    ${(reg.registration_status || reg.status || 'Approved').charAt(0).toUpperCase() + (reg.registration_status || reg.status || 'Approved').slice(1).toLowerCase()}
+                </span>
+            </div>
+            <div class="registration-actions">
+                <button class="btn btn-sm btn-info" onclick="viewAlumniProfile(${reg.user_id})" title="View Profile">
+                    <i class="fas fa-user"></i>
+                </button>
+                <button class="btn btn-sm btn-warning" onclick="sendReminder(${reg.id})" title="Send Reminder">
+                    <i class="fas fa-bell"></i>
+                </button>
+                <button class="btn btn-sm btn-danger" onclick="removeRegistration(${reg.id})" title="Remove Registration">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </div>
+    `).join('');
+    }
+
+    function closeRegistrationModal() {
+        document.getElementById('registrationModal').style.display = 'none';
+        clearRegistrationSelection();
+    }
+
+    function clearRegistrationSelection() {
+        selectedRegistrations.clear();
+        document.querySelectorAll('.registration-select').forEach(checkbox => {
+            checkbox.checked = false;
+        });
+        document.getElementById('registrationBulkActions').style.display = 'none';
+    }
+
+    // Registration selection handling
+    let selectedRegistrations = new Set();
+
+    function setupRegistrationSelection() {
+        document.addEventListener('change', function (e) {
+            if (e.target.classList.contains('registration-select')) {
+                const registrationId = e.target.value;
+                if (e.target.checked) {
+                    selectedRegistrations.add(registrationId);
+                } else {
+                    selectedRegistrations.delete(registrationId);
+                }
+
+                // Update bulk actions visibility
+                const bulkActions = document.getElementById('registrationBulkActions');
+                const selectedCount = document.getElementById('selectedRegistrationCount');
+
+                if (selectedRegistrations.size > 0) {
+                    bulkActions.style.display = 'flex';
+                    selectedCount.textContent = selectedRegistrations.size;
+                } else {
+                    bulkActions.style.display = 'none';
+                }
+            }
+        });
+    }
+
+    // Filter registrations
+    function filterRegistrations() {
+        const searchTerm = document.getElementById('registrationSearch').value.toLowerCase();
+        const registrationItems = document.querySelectorAll('.registration-item');
+
+        registrationItems.forEach(item => {
+            const name = item.querySelector('h4').textContent.toLowerCase();
+            const email = item.querySelector('p').textContent.toLowerCase();
+
+            if (name.includes(searchTerm) || email.includes(searchTerm)) {
+                item.style.display = 'flex';
+            } else {
+                item.style.display = 'none';
+            }
+        });
+    }
+
+    // Individual registration actions
+    function viewAlumniProfile(userId) {
+        // Open alumni profile in new tab
+        window.open(`/admin/alumni/${userId}/profile`, '_blank');
+    }
+
+    function sendReminder(registrationId) {
+        if (confirm('Send reminder email to this alumni?')) {
+            fetch(`/admin/events/registration/${registrationId}/remind`, {
+                method: 'POST'
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification('Reminder sent successfully', 'success');
+                    } else {
+                        showNotification(data.message || 'Error sending reminder', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error sending reminder', 'error');
+                });
+        }
+    }
+
+    function removeRegistration(registrationId) {
+        if (confirm('Remove this registration? The alumni will be notified.')) {
+            fetch(`/admin/events/registration/${registrationId}/remove`, {
+                method: 'DELETE'
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification('Registration removed successfully', 'success');
+                        // Remove the registration item from the list
+                        const registrationItem = document.querySelector(`[data-registration-id="${registrationId}"]`);
+                        if (registrationItem) {
+                            registrationItem.remove();
+                        }
+                        // Update count
+                        const currentCount = parseInt(document.getElementById('registrationCount').textContent);
+                        document.getElementById('registrationCount').textContent = `${currentCount - 1} registrations`;
+                    } else {
+                        showNotification(data.message || 'Error removing registration', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error removing registration', 'error');
+                });
+        }
+    }
+
+    // Bulk actions
+    function bulkApproveRegistrations() {
+        if (selectedRegistrations.size === 0) return;
+
+        if (confirm(`Approve ${selectedRegistrations.size} selected registrations?`)) {
+            fetch('/admin/events/registrations/bulk-approve', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    registration_ids: Array.from(selectedRegistrations)
+                })
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification('Registrations approved successfully', 'success');
+                        clearRegistrationSelection();
+                        // Refresh the registration list
+                        const eventId = document.querySelector('.registration-item')?.dataset.eventId;
+                        if (eventId) viewRegistrations(eventId);
+                    } else {
+                        showNotification(data.message || 'Error approving registrations', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error approving registrations', 'error');
+                });
+        }
+    }
+
+    function bulkRemoveRegistrations() {
+        if (selectedRegistrations.size === 0) return;
+
+        if (confirm(`Remove ${selectedRegistrations.size} selected registrations? Alumni will be notified.`)) {
+            fetch('/admin/events/registrations/bulk-remove', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    registration_ids: Array.from(selectedRegistrations)
+                })
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification('Registrations removed successfully', 'success');
+                        clearRegistrationSelection();
+                        // Refresh the registration list
+                        const eventId = document.querySelector('.registration-item')?.dataset.eventId;
+                        if (eventId) viewRegistrations(eventId);
+                    } else {
+                        showNotification(data.message || 'Error removing registrations', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error removing registrations', 'error');
+                });
+        }
+    }
+
+    function sendBulkReminders() {
+        if (selectedRegistrations.size === 0) {
+            // Send to all if none selected
+            if (confirm('Send reminder emails to all registered alumni?')) {
+                const allRegistrations = Array.from(document.querySelectorAll('.registration-select')).map(cb => cb.value);
+                sendBulkReminderRequest(allRegistrations);
+            }
+        } else {
+            if (confirm(`Send reminder emails to ${selectedRegistrations.size} selected alumni?`)) {
+                sendBulkReminderRequest(Array.from(selectedRegistrations));
+            }
+        }
+    }
+
+    function sendBulkReminderRequest(registrationIds) {
+        fetch('/admin/events/registrations/bulk-remind', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                registration_ids: registrationIds
+            })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    showNotification(`Reminders sent to ${registrationIds.length} alumni`, 'success');
+                } else {
+                    showNotification(data.message || 'Error sending reminders', 'error');
+                }
+            })
+            .catch(error => {
+                showNotification('Error sending reminders', 'error');
+            });
+    }
+
+    // Event Actions
+    function deleteEvent(eventId) {
+        if (confirm('Are you sure you want to delete this event? This action cannot be undone.')) {
+            fetch(`/admin/events/${eventId}/delete`, {
+                method: 'DELETE'
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification('Event deleted successfully', 'success');
+                        setTimeout(() => location.reload(), 1500);
+                    } else {
+                        showNotification(data.message || 'Error deleting event', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error deleting event', 'error');
+                });
+        }
+    }
+
+    function duplicateEvent(eventId) {
+        fetch(`/admin/events/${eventId}/duplicate`, {
+            method: 'POST'
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    showNotification('Event duplicated successfully', 'success');
+                    setTimeout(() => location.reload(), 1500);
+                } else {
+                    showNotification(data.message || 'Error duplicating event', 'error');
+                }
+            })
+            .catch(error => {
+                showNotification('Error duplicating event', 'error');
+            });
+    }
+
+    function sendReminders(eventId) {
+        fetch(`/admin/events/${eventId}/send-reminders`, {
+            method: 'POST'
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    showNotification(`Reminders sent to ${data.count} alumni`, 'success');
+                } else {
+                    showNotification(data.message || 'Error sending reminders', 'error');
+                }
+            })
+            .catch(error => {
+                showNotification('Error sending reminders', 'error');
+            });
+    }
+
+    // Live Event Functions
+    function monitorLiveEvent(eventId) {
+        window.open(`/admin/events/${eventId}/monitor`, '_blank');
+    }
+
+    function sendLiveUpdate(eventId) {
+        const message = prompt('Enter message to broadcast to attendees:');
+        if (message) {
+            fetch(`/admin/events/${eventId}/broadcast`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ message: message })
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification('Message broadcasted to attendees', 'success');
+                    } else {
+                        showNotification('Error broadcasting message', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error broadcasting message', 'error');
+                });
+        }
+    }
+
+    function endEvent(eventId) {
+        if (confirm('Are you sure you want to end this live event?')) {
+            fetch(`/admin/events/${eventId}/end`, {
+                method: 'POST'
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification('Event ended successfully', 'success');
+                        setTimeout(() => location.reload(), 1500);
+                    } else {
+                        showNotification('Error ending event', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error ending event', 'error');
+                });
+        }
+    }
+
+    // Bulk Actions
+    function bulkDelete() {
+        if (selectedEvents.size === 0) return;
+
+        if (confirm(`Are you sure you want to delete ${selectedEvents.size} selected events?`)) {
+            fetch('/admin/events/bulk-delete', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ event_ids: Array.from(selectedEvents) })
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification(`${data.deleted_count} events deleted successfully`, 'success');
+                        setTimeout(() => location.reload(), 1500);
+                    } else {
+                        showNotification('Error deleting events', 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error deleting events', 'error');
+                });
+        }
+    }
+
+    function bulkSendReminders() {
+        if (selectedEvents.size === 0) return;
+
+        fetch('/admin/events/bulk-reminders', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ event_ids: Array.from(selectedEvents) })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    showNotification(`Reminders sent for ${data.event_count} events`, 'success');
+                } else {
+                    showNotification('Error sending reminders', 'error');
+                }
+            })
+            .catch(error => {
+                showNotification('Error sending reminders', 'error');
+            });
+    }
+
+    function bulkExport() {
+        if (selectedEvents.size === 0) return;
+
+        const eventIds = Array.from(selectedEvents).join(',');
+        window.open(`/admin/events/export?event_ids=${eventIds}`, '_blank');
+    }
+
+    // Export Functions
+    function exportAllEvents() {
+        window.open('/admin/events/export', '_blank');
+    }
+
+    function exportEvent(eventId) {
+        window.open(`/admin/events/export?event_ids=${eventId}`, '_blank');
+    }
+
+    function exportRegistrations() {
+        window.open(`/admin/exports/registrations?event_id=${registrationsEventId}`, '_blank');
+    }
+
+    // Utility Functions
+    function setupDropdowns() {
+        document.addEventListener('click', function (e) {
+            if (e.target.classList.contains('dropdown-toggle')) {
+                e.preventDefault();
+                const dropdown = e.target.closest('.dropdown');
+
+                // Close all other dropdowns
+                document.querySelectorAll('.dropdown.active').forEach(d => {
+                    if (d !== dropdown) d.classList.remove('active');
+                });
+
+                // Toggle current dropdown
+                dropdown.classList.toggle('active');
+            } else {
+                // Close all dropdowns when clicking outside
+                document.querySelectorAll('.dropdown.active').forEach(d => {
+                    d.classList.remove('active');
+                });
+            }
+        });
+    }
+
+    function refreshLiveEvents() {
+        // Refresh live events data
+        if (currentFilter === 'ongoing' || currentFilter === 'all') {
+            fetch('/admin/events/live-status')
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        updateLiveEventStatus(data.events);
+                    }
+                })
+                .catch(error => {
+                    console.log('Error refreshing live events:', error);
+                });
+        }
+    }
+
+    function subscribeLiveEvents() {
+        if (!window.EventSource) {
+            setInterval(refreshLiveEvents, 30000); // Refresh every 30 seconds
+            return;
+        }
+
+        const source = new EventSource('/admin/events/live-stream');
+        const applyUpdate = message => {
+            const data = JSON.parse(message.data);
+            updateLiveEventStatus(data.events);
+        };
+        source.addEventListener('snapshot', applyUpdate);
+        source.addEventListener('delta', applyUpdate);
+        source.onerror = error => {
+            if (source.readyState === EventSource.CLOSED) {
+                // Turned away while the server's stream slots are full
+                setInterval(refreshLiveEvents, 30000);
+                return;
+            }
+            console.log('Live event stream interrupted, reconnecting:', error);
+        };
+    }
+
+    function updateLiveEventStatus(events) {
+        // Update live event indicators and counts
+        events.forEach(event => {
+            if (event.removed) {
+                return;
+            }
+            const eventElement = document.querySelector(`[data-event-id="${event.id}"]`);
+            if (eventElement) {
+                const attendeeCount = eventElement.querySelector('.event-meta span:last-child');
+                if (attendeeCount) {
+                    attendeeCount.innerHTML = `<i class="fas fa-users"></i> ${event.current_attendees} attending`;
+                }
+            }
+        });
+    }
+
+    // Notification System
+    function showNotification(message, type = 'info') {
+        // Create notification element
+        const notification = document.createElement('div');
+        notification.className = `notification notification-${type}`;
+        notification.innerHTML = `
+        <div class="notification-content">
+            <i class="fas fa-${type === 'success' ? 'check-circle' : type === 'error' ? 'exclamation-circle' : 'info-circle'}"></i>
+            <span>${message}</span>
+        </div>
+        <button class="notification-close" onclick="this.parentElement.remove()">×</button>
+    `;
+
+        // Add to page
+        document.body.appendChild(notification);
+
+        // Auto remove after 5 seconds
+        setTimeout(() => {
+            if (notification.parentElement) {
+                notification.remove();
+            }
+        }, 5000);
+    }
+
+    // Add notification styles
+    const notificationStyles = `
+<style>
+.notification {
+    position: fixed;
+    top: 20px;
+    right: 20px;
+    background: white;
+    border-radius: 8px;
+    box-shadow: 0 4px 20px rgba(0,0,0,0.15);
+    padding: 15px 20px;
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    z-index: 3000;
+    min-width: 300px;
+    border-left: 4px solid #667eea;
+}
+
+.notification-success { border-left-color: #28a745; }
+.notification-error { border-left-color: #dc3545; }
+.notification-warning { border-left-color: #ffc107; }
+
+.notification-content {
+    display: flex;
+    align-items: center;
+    gap: 10px;
+}
+
+.notification-close {
+    background: none;
+    border: none;
+    font-size: 1.2rem;
+    cursor: pointer;
+    color: #9ca3af;
+    margin-left: 15px;
+}
+</style>
+`;
+
+    document.head.insertAdjacentHTML('beforeend', notificationStyles);
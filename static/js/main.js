@@ -27,6 +27,9 @@ function initializeApp() {
     
     // Set active navigation
     setActiveNavigation();
+    
+    // Live unread message badge
+    initMessageCount();
 }
 
 // Sidebar functionality
@@ -701,30 +704,56 @@ window.AlumniPlatform = {
     getFromLocalStorage
 };// M
 essage count functionality
+function initMessageCount() {
+    if (!document.getElementById('messageCount')) return; // Not logged in
+    
+    // Each open stream holds a server thread, so only the inbox has the count
+    // pushed; every other page polls
+    if (window.EventSource && document.getElementById('inbox-tab')) {
+        const source = new EventSource('/api/message_count/stream');
+        source.onmessage = event => renderMessageCount(JSON.parse(event.data).count);
+        source.onerror = () => {
+            // Turned away while the server's stream slots are full
+            if (source.readyState === EventSource.CLOSED) {
+                pollMessageCount();
+            }
+        };
+    } else {
+        pollMessageCount();
+    }
+}
+
+function pollMessageCount() {
+    updateMessageCount();
+    setInterval(updateMessageCount, 30000);
+}
+
 function updateMessageCount() {
     fetch('/api/message_count')
         .then(response => response.json())
-        .then(data => {
-            const messageCountBadge = document.getElementById('messageCount');
-            const messageBadge = document.getElementById('messageBadge');
-            
-            if (data.count > 0) {
-                if (messageCountBadge) {
-                    messageCountBadge.textContent = data.count;
-                    messageCountBadge.style.display = 'inline';
-                }
-                if (messageBadge) {
-                    messageBadge.textContent = data.count;
-                    messageBadge.style.display = 'inline';
-                }
-            } else {
-                if (messageCountBadge) messageCountBadge.style.display = 'none';
-                if (messageBadge) messageBadge.style.display = 'none';
-            }
-        })
+        .then(data => renderMessageCount(data.count))
         .catch(error => console.log('Error fetching message count:', error));
 }
 
+function renderMessageCount(count) {
+    const messageCountBadge = document.getElementById('messageCount');
+    const messageBadge = document.getElementById('messageBadge');
+    
+    if (count > 0) {
+        if (messageCountBadge) {
+            messageCountBadge.textContent = count;
+            messageCountBadge.style.display = 'inline';
+        }
+        if (messageBadge) {
+            messageBadge.textContent = count;
+            messageBadge.style.display = 'inline';
+        }
+    } else {
+        if (messageCountBadge) messageCountBadge.style.display = 'none';
+        if (messageBadge) messageBadge.style.display = 'none';
+    }
+}
+
 
 
 // Close modal when clicking overlay
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from config import Config
+
+STATS_QUERY = """
+    SELECT COUNT(*) as total_alumni,
+           COALESCE(SUM(is_verified = TRUE), 0) as verified_alumni,
+           COALESCE(SUM(is_verified = FALSE), 0) as pending_verification,
+           (SELECT COUNT(*) FROM events) as total_events,
+           (SELECT COUNT(*) FROM event_registrations) as total_registrations,
+           (SELECT COUNT(*) FROM forum_posts) as total_posts
+    FROM users
+    WHERE role = 'alumni'
+"""
+
+
+class DashboardStats:
+    """Admin dashboard totals computed with one query and cached as a snapshot.
+
+    The snapshot is recomputed after DASHBOARD_STATS_TTL seconds or when a
+    write calls `invalidate()`. Writes that know exactly what changed can
+    call `adjust()` instead, which moves the cached counters in place (when
+    DASHBOARD_STATS_INCREMENTAL is on) so the next page view costs nothing.
+    """
+
+    def __init__(self, db=None, ttl=None):
+        self._db = db
+        self.ttl = ttl or Config.DASHBOARD_STATS_TTL
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0
+        self._generation = 0  # bumped by every write notification
+        self._listeners = []
+
+    @property
+    def db(self):
+        if self._db is None:
+            from models import Database
+            self._db = Database()
+        return self._db
+
+    def snapshot(self):
+        """Current totals as a dict"""
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() < self._expires_at:
+                return dict(self._snapshot)
+            generation = self._generation
+        stats = self.db.execute_single(STATS_QUERY) or {}
+        with self._lock:
+            # A write during the query may or may not be counted; don't cache it
+            if self._generation == generation:
+                self._snapshot = stats
+                self._expires_at = time.monotonic() + self.ttl
+        return dict(stats)
+
+    def adjust(self, **deltas):
+        """Move cached counters, e.g. adjust(total_alumni=1, pending_verification=1)"""
+        with self._lock:
+            self._generation += 1
+            if self._snapshot is not None:
+                if Config.DASHBOARD_STATS_INCREMENTAL:
+                    for name, delta in deltas.items():
+                        self._snapshot[name] = max(0, self._snapshot.get(name, 0) + delta)
+                else:
+                    self._snapshot = None
+        self._notify()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+        self._notify()
+
+    def subscribe(self, callback):
+        """Call `callback()` after every adjust() or invalidate()"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
+
+
+dashboard_stats = DashboardStats()
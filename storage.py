@@ -0,0 +1,175 @@
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+from config import Config
+
+
+class StorageBackend:
+    """Where file bodies live. Bodies are addressed by their SHA-256 digest.
+
+    Backends receive a finished temporary file from `FileStore` and never
+    see partial uploads.
+    """
+
+    def staging_file(self):
+        """A writable temporary file object for an incoming upload"""
+        raise NotImplementedError
+
+    def commit(self, staged_path, digest):
+        """Take ownership of a staged file as the body of `digest`"""
+        raise NotImplementedError
+
+    def exists(self, digest):
+        raise NotImplementedError
+
+    def open(self, digest):
+        """Readable binary file object for the body"""
+        raise NotImplementedError
+
+    def local_path(self, digest):
+        """Filesystem path of the body, or None when it isn't on local disk"""
+        return None
+
+    def delete(self, digest):
+        raise NotImplementedError
+
+
+class LocalFileSystemBackend(StorageBackend):
+    """Bodies stored as <root>/ab/cd/<digest>, staged in <root>/tmp"""
+
+    def __init__(self, root):
+        self.root = root
+        self.staging = os.path.join(root, 'tmp')
+
+    def local_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def staging_file(self):
+        os.makedirs(self.staging, exist_ok=True)  # created on first upload, not at import
+        return tempfile.NamedTemporaryFile(dir=self.staging, delete=False)
+
+    def commit(self, staged_path, digest):
+        path = self.local_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged_path, path)  # atomic: readers never see a partial body
+
+    def exists(self, digest):
+        return os.path.exists(self.local_path(digest))
+
+    def open(self, digest):
+        return open(self.local_path(digest), 'rb')
+
+    def delete(self, digest):
+        try:
+            os.remove(self.local_path(digest))
+        except FileNotFoundError:
+            pass
+
+
+BACKENDS = {
+    'local': lambda: LocalFileSystemBackend(os.path.abspath(os.path.join(Config.UPLOAD_FOLDER, 'files'))),
+}
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+def is_content_addressed(name):
+    """True for names produced by FileStore.put()"""
+    digest, _ = split_name(name)
+    return len(digest) == 64 and all(c in '0123456789abcdef' for c in digest)
+
+
+def split_name(name):
+    """('<digest>', '.ext') from a stored file name such as 'ab12….pdf'"""
+    digest, ext = os.path.splitext(os.path.basename(name or ''))
+    return digest, ext.lower()
+
+
+class FileStore:
+    """Content-addressed uploads with reference counts.
+
+    `put()` streams an upload to the backend in chunks while hashing it and
+    returns a name of the form '<sha256><ext>'; identical bodies are stored
+    once and the `stored_files` row counts how many places refer to them.
+    Every `put()` must eventually be balanced by a `release()`.
+
+    Refcounts change on a connection of their own, in a BEGIN IMMEDIATE
+    transaction, and bodies are written and deleted before it commits: a
+    `put()` and a `release()` of the same body, in any thread or process,
+    can't interleave between the refcount decision and the file operation.
+    """
+
+    def __init__(self, db, backend=None, db_path=None):
+        self.db = db
+        self.backend = backend or BACKENDS[Config.STORAGE_BACKEND]()
+        self.db_path = db_path or Config.DATABASE_PATH
+
+    @contextmanager
+    def _write_transaction(self):
+        """Connection holding SQLite's write lock until the block ends (committed) or raises (rolled back)"""
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            connection.close()
+
+    def put(self, stream, filename, max_size=None):
+        ext = os.path.splitext(filename)[1].lower()
+        digest = hashlib.sha256()
+        size = 0
+        staged = self.backend.staging_file()
+        try:
+            with staged:
+                while True:
+                    chunk = stream.read(Config.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size and size > max_size:
+                        raise FileTooLarge(f'File exceeds {max_size // (1024 * 1024)} MB')
+                    digest.update(chunk)
+                    staged.write(chunk)
+            digest = digest.hexdigest()
+
+            with self._write_transaction() as connection:
+                connection.execute("""
+                    INSERT INTO stored_files (digest, size, content_type, refcount)
+                    VALUES (?, ?, ?, 1)
+                    ON CONFLICT (digest) DO UPDATE SET refcount = refcount + 1
+                """, (digest, size, mimetypes.guess_type(filename)[0] or 'application/octet-stream'))
+                if not self.backend.exists(digest):
+                    self.backend.commit(staged.name, digest)
+        finally:
+            if os.path.exists(staged.name):
+                os.remove(staged.name)  # duplicate body or failed upload
+        return f'{digest}{ext}'
+
+    def release(self, name):
+        """Drop one reference; the body is deleted with the last one"""
+        digest, _ = split_name(name)
+        if not digest:
+            return
+        with self._write_transaction() as connection:
+            connection.execute("UPDATE stored_files SET refcount = refcount - 1 WHERE digest = ?", (digest,))
+            deleted = connection.execute("""
+                DELETE FROM stored_files WHERE digest = ? AND refcount <= 0 RETURNING digest
+            """, (digest,)).fetchone()
+            if deleted:
+                self.backend.delete(digest)
+
+    def info(self, name):
+        """stored_files row for a stored name, or None"""
+        digest, _ = split_name(name)
+        return self.db.execute_single("SELECT * FROM stored_files WHERE digest = ?", (digest,))
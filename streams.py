@@ -0,0 +1,64 @@
+"""Server-sent event streams on a bounded pool of worker threads.
+
+With the gthread worker an open stream holds one of the worker's threads
+until the client goes away, so `StreamSlots` caps how many streams a
+process serves at once (SSE_MAX_STREAMS, kept below the thread count) and
+ordinary requests always find a free thread. A client that finds every
+slot taken gets a 503 and falls back to polling. Streams also end after
+SSE_MAX_DURATION seconds; EventSource reconnects by itself, which lets
+graceful reloads finish and spreads clients across workers.
+"""
+
+import threading
+import time
+
+from flask import Response
+
+from config import Config
+from metrics import metrics
+
+
+class _BoundedStream:
+    """Iterates a stream until its deadline; releases the slot on close()"""
+
+    def __init__(self, stream, release, max_duration):
+        self.stream = stream
+        self._release = release
+        self._deadline = time.monotonic() + max_duration
+        self._closed = False
+
+    def __iter__(self):
+        for chunk in self.stream:
+            yield chunk
+            if time.monotonic() > self._deadline:
+                return
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if hasattr(self.stream, 'close'):
+                self.stream.close()
+        finally:
+            self._release()
+
+
+class StreamSlots:
+    def __init__(self, limit=None, max_duration=None):
+        self.limit = limit or Config.SSE_MAX_STREAMS
+        self.max_duration = max_duration or Config.SSE_MAX_DURATION
+        self._slots = threading.BoundedSemaphore(self.limit)
+
+    def response(self, stream):
+        """An event-stream Response for the `stream` generator, or a 503 when the slots are full"""
+        if not self._slots.acquire(blocking=False):
+            if hasattr(stream, 'close'):
+                stream.close()
+            metrics.increment('streams.rejected')
+            return Response('Too many open streams, poll instead\n', status=503, mimetype='text/plain',
+                            headers={'Retry-After': str(Config.SSE_RETRY_AFTER)})
+        metrics.increment('streams.opened')
+        return Response(_BoundedStream(stream, self._slots.release, self.max_duration),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,159 @@
+"""Background job handlers for slow admin work (see jobs.py)"""
+
+import os
+
+import analytics
+from alumni_import import import_alumni
+from exports import EXPORTS
+from jobs import job_queue
+from stats import dashboard_stats
+from cache import app_cache
+from outbox import default_outbox, queue_emails, render_email
+
+BATCH_SIZE = 500
+
+REMINDER_QUERY = """
+    SELECT er.id, er.user_id, e.title as event_title, e.event_date, ap.name, u.email
+    FROM event_registrations er
+    JOIN events e ON er.event_id = e.id
+    JOIN alumni_profiles ap ON er.user_id = ap.user_id
+    JOIN users u ON er.user_id = u.id
+"""
+
+outbox = default_outbox()
+
+
+def _format_date(value):
+    return value.strftime('%B %d, %Y at %I:%M %p') if hasattr(value, 'strftime') else value
+
+
+def _queue_in_batches(db, query, id_column, where, params, build_email, progress):
+    """Queue one email per matching row, reading and inserting BATCH_SIZE rows at a time.
+
+    Rows are paged by `id_column`, which `query` must also select as `id`.
+    """
+    total = db.execute_single(f"""
+        SELECT COUNT(*) as count FROM ({query} WHERE {where})
+    """, params)['count']
+    progress(0, total)
+
+    queued = 0
+    last_id = 0
+    while True:
+        batch = db.execute_query(f"""
+            {query}
+            WHERE {where} AND {id_column} > ?
+            ORDER BY {id_column}
+            LIMIT {BATCH_SIZE}
+        """, list(params) + [last_id]) or []
+        if not batch:
+            break
+        queue_emails(db, [build_email(row) for row in batch])
+        queued += len(batch)
+        last_id = batch[-1]['id']
+        progress(queued, total)
+
+    if queued:
+        job_queue.enqueue('outbox_flush', {})
+    return {'queued': queued}
+
+
+def _reminder_email(row):
+    subject, body = render_email('event_reminder', name=row['name'], event_title=row['event_title'],
+                                 event_date=_format_date(row['event_date']))
+    return (row['email'], subject, body, 'event_reminder')
+
+
+@job_queue.handler('event_reminders')
+def event_reminders(db, payload, progress):
+    """Remind every registrant of one or more events"""
+    event_ids = payload['event_ids']
+    placeholders = ','.join(['?' for _ in event_ids])
+    return _queue_in_batches(db, REMINDER_QUERY, 'er.id', f"er.event_id IN ({placeholders})", event_ids,
+                             _reminder_email, progress)
+
+
+@job_queue.handler('registration_reminders')
+def registration_reminders(db, payload, progress):
+    """Remind a specific set of registrations"""
+    registration_ids = payload['registration_ids']
+    placeholders = ','.join(['?' for _ in registration_ids])
+    return _queue_in_batches(db, REMINDER_QUERY, 'er.id', f"er.id IN ({placeholders})", registration_ids,
+                             _reminder_email, progress)
+
+
+@job_queue.handler('event_broadcast_emails')
+def event_broadcast_emails(db, payload, progress):
+    """Email an admin broadcast to every attendee of an event"""
+    def build_email(row):
+        subject, body = render_email('event_broadcast', name=row['name'], event_title=row['event_title'],
+                                     subject=payload['subject'], message=payload['message'])
+        return (row['email'], subject, body, 'event_broadcast')
+
+    return _queue_in_batches(db, REMINDER_QUERY, 'er.id', "er.event_id = ? AND er.status != 'rejected'",
+                             [payload['event_id']], build_email, progress)
+
+
+@job_queue.handler('new_event_notifications')
+def new_event_notifications(db, payload, progress):
+    """Announce a newly created event to all verified alumni"""
+    event = db.execute_single("SELECT * FROM events WHERE id = ?", (payload['event_id'],))
+    if not event:
+        return {'queued': 0}
+
+    def build_email(row):
+        subject, body = render_email('new_event', name=row['name'], event_title=event['title'],
+                                     event_date=_format_date(event['event_date']),
+                                     location=event['location'], description=event['description'])
+        return (row['email'], subject, body, 'new_event')
+
+    return _queue_in_batches(db, """
+        SELECT u.id, ap.name, u.email
+        FROM users u
+        JOIN alumni_profiles ap ON ap.user_id = u.id
+    """, 'u.id', "u.role = 'alumni' AND u.is_verified = TRUE", [], build_email, progress)
+
+
+@job_queue.handler('outbox_flush')
+def outbox_flush(db, payload, progress):
+    """Deliver queued email; deferred messages make the job retry with backoff"""
+    totals = outbox.flush(db, progress=progress)
+    if totals['queued']:
+        raise RuntimeError(f"{totals['queued']} emails deferred: SMTP server unavailable")
+    return totals
+
+
+@job_queue.handler('export')
+def export_file(db, payload, progress):
+    """Write a large export to EXPORT_FOLDER for download once finished"""
+    export = EXPORTS[payload['name']]
+    args = payload.get('args') or {}
+    progress(0, export.count(db, args))
+    filename, rows = export.write_file(db, args, payload.get('format', 'csv'), payload.get('gzip', False),
+                                       progress=progress)
+    return {'file': filename, 'rows': rows, 'download_url': f'/admin/exports/files/{filename}'}
+
+
+@job_queue.handler('alumni_import')
+def alumni_import(db, payload, progress):
+    """Bulk-create alumni from an uploaded CSV"""
+    def save_checkpoint(cursor, state):
+        job_queue.save_checkpoint(cursor, progress.job_id, state)
+
+    # A retry resumes after the last committed chunk
+    result = import_alumni(db, payload['path'], auto_verify=payload.get('auto_verify', False),
+                           default_password_hash=payload.get('default_password_hash'), progress=progress,
+                           resume=progress.checkpoint, save_checkpoint=save_checkpoint)
+    os.remove(payload['path'])
+    dashboard_stats.invalidate()
+    app_cache.invalidate('profiles')
+    if result['error_report']:
+        result['error_report_url'] = f"/admin/exports/files/{result['error_report']}"
+    return result
+
+
+@job_queue.handler('analytics_rebuild')
+def analytics_rebuild(db, payload, progress):
+    """Recompute the chart rollups from the source tables"""
+    analytics.rebuild(db)
+    return {'rows': db.execute_single("SELECT COUNT(*) as count FROM stats_rollups")['count']}
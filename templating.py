@@ -0,0 +1,49 @@
+"""Template bytecode cache and warm-up.
+
+    python templating.py      # compile every template into the bytecode cache
+
+Compiled templates are stored in Config.TEMPLATE_CACHE_FOLDER, so a fresh
+process loads bytecode instead of parsing and compiling the source (the
+admin and events pages are several thousand lines each). `warm_up()` loads
+every template up front so the first request after a deploy or restart
+doesn't pay for compilation either.
+"""
+
+import os
+import sys
+import time
+
+from jinja2 import FileSystemBytecodeCache
+
+from config import Config
+from metrics import metrics
+
+
+def install_bytecode_cache(app, folder=None):
+    folder = os.path.join(app.root_path, folder or Config.TEMPLATE_CACHE_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(folder)
+
+
+def warm_up(app):
+    """Load every template into the environment's cache; return (count, seconds)"""
+    started = time.perf_counter()
+    names = [name for name in app.jinja_env.list_templates() if name.endswith(('.html', '.txt'))]
+    for name in names:
+        app.jinja_env.get_template(name)
+    elapsed = time.perf_counter() - started
+    metrics.observe('startup.templates_ms', elapsed * 1000)
+    return len(names), elapsed
+
+
+if __name__ == '__main__':
+    from flask import Flask
+    from fragments import fragment_cache
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    flask_app = Flask(__name__, root_path=root)
+    fragment_cache.init_app(flask_app)  # the templates use {% cache %}
+    install_bytecode_cache(flask_app)
+    count, seconds = warm_up(flask_app)
+    print(f'Compiled {count} templates in {seconds * 1000:.0f} ms')
+    sys.exit(0)
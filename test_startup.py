@@ -0,0 +1,47 @@
+"""Start-up checks: importing the app has no side effects, start-up stays
+within budget, and a current schema skips the DDL."""
+
+import statistics
+
+import pytest
+
+import models
+from config import Config
+from passwords import password_hasher
+from startup_benchmark import IMPORT_BUDGET_MS, STARTUP_BUDGET_MS, probe
+
+DDL = ('CREATE', 'ALTER', 'DROP')
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'test.db'))
+    monkeypatch.setattr(password_hasher, '_cost', 4)
+    return tmp_path / 'test.db'
+
+
+def test_probe_within_budgets(tmp_path):
+    cold = probe(tmp_path)  # creates the schema
+    runs = [probe(tmp_path) for _ in range(3)]
+    for run in [cold] + runs:
+        assert run['created_on_import'] == []
+    assert statistics.median(run['import_ms'] for run in runs) <= IMPORT_BUDGET_MS
+    assert statistics.median(run['startup_ms'] for run in runs) <= STARTUP_BUDGET_MS
+
+
+def test_init_database_skips_current_schema(database, monkeypatch):
+    statements = []
+    connect = models.Database.connect
+
+    def traced_connect(self):
+        connect(self)
+        self._connection.set_trace_callback(statements.append)
+
+    monkeypatch.setattr(models.Database, 'connect', traced_connect)
+
+    assert models.init_database() is True
+    assert any(statement.lstrip().upper().startswith(DDL) for statement in statements)
+
+    statements.clear()
+    assert models.init_database() is False
+    assert statements == ['PRAGMA user_version']
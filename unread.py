@@ -0,0 +1,85 @@
+import json
+import threading
+
+
+# The users a shared broadcast `b` reaches: the same registrants that
+# admin_broadcast_message() writes per-recipient copies for. Takes the user id.
+BROADCAST_RECIPIENT_SQL = """
+    EXISTS (SELECT 1 FROM event_registrations er
+            WHERE er.event_id = b.event_id AND er.user_id = ?
+              AND er.status != 'rejected' AND er.user_id != b.sender_id)
+"""
+
+
+class UnreadCounts:
+    """Per-user unread message counts kept in memory and pushed to open pages.
+
+    A user's count is loaded with one query the first time it is needed and
+    then moved by the messaging routes; `publish()` wakes every stream that
+    is waiting on one of the affected users. Writes made elsewhere (other
+    workers, jobs) arrive through the change feed as `invalidate()` calls.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._cond = threading.Condition()
+        self._counts = {}    # user_id -> unread count
+        self._versions = {}  # user_id -> bumped on every change
+
+    def _load(self, user_id):
+        row = self.db.execute_single(f"""
+            SELECT (SELECT COUNT(*) FROM messages
+                    WHERE recipient_id = ? AND is_read = FALSE)
+                 + (SELECT COUNT(*) FROM broadcasts b
+                    LEFT JOIN broadcast_reads br ON br.broadcast_id = b.id AND br.user_id = ?
+                    WHERE br.broadcast_id IS NULL AND {BROADCAST_RECIPIENT_SQL}) as count
+        """, (user_id, user_id, user_id))
+        return row['count'] if row else 0
+
+    def get(self, user_id):
+        with self._cond:
+            count = self._counts.get(user_id)
+            version = self._versions.get(user_id, 0)
+        if count is None:
+            count = self._load(user_id)
+            with self._cond:
+                # Only cache if nothing was published while loading
+                if self._versions.get(user_id, 0) == version:
+                    self._counts[user_id] = count
+        return count
+
+    def version(self, user_id):
+        with self._cond:
+            return self._versions.get(user_id, 0)
+
+    def publish(self, user_ids, delta=None):
+        """Apply `delta` to each user's cached count, or reload it when delta is None"""
+        with self._cond:
+            for user_id in user_ids:
+                if delta is None or user_id not in self._counts:
+                    self._counts.pop(user_id, None)
+                else:
+                    self._counts[user_id] = max(0, self._counts[user_id] + delta)
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._cond.notify_all()
+
+    def invalidate(self, *user_ids):
+        """Reload the counts of `user_ids` (every cached user when none are given)"""
+        if not user_ids:
+            with self._cond:
+                user_ids = list(set(self._counts) | set(self._versions))
+        self.publish(user_ids)
+
+    def stream(self, user_id, heartbeat=25):
+        """Server-sent event generator emitting the count whenever it changes"""
+        version = self.version(user_id)
+        yield f"data: {json.dumps({'count': self.get(user_id)})}\n\n"
+        while True:
+            with self._cond:
+                changed = self._cond.wait_for(lambda: self._versions.get(user_id, 0) != version,
+                                              timeout=heartbeat)
+                version = self._versions.get(user_id, 0)
+            if changed:
+                yield f"data: {json.dumps({'count': self.get(user_id)})}\n\n"
+            else:
+                yield ": keepalive\n\n"
@@ -0,0 +1,59 @@
+from cache import app_cache
+from config import Config
+
+
+class CurrentUser:
+    """The logged-in user's `users` row and alumni profile (None until created)"""
+
+    def __init__(self, user, profile):
+        self.user = user
+        self.profile = profile
+
+    @property
+    def id(self):
+        return self.user['id']
+
+    @property
+    def role(self):
+        return self.user['role']
+
+    @property
+    def is_verified(self):
+        return bool(self.user['is_verified'])
+
+    @property
+    def has_profile(self):
+        return self.profile is not None
+
+
+class UserContext:
+    """User and profile rows by user id, shared across requests for a few seconds.
+
+    Every entry is tagged 'user:<id>'; writes to a user's row or profile
+    call `invalidate(user_id)` (the change feed does the same for writes
+    made by other processes), so the TTL only bounds how long a missed
+    invalidation can go unnoticed.
+    """
+
+    def __init__(self, db, cache=None, ttl=None):
+        self.db = db
+        self.cache = (cache or app_cache).namespace('users', ttl or Config.USER_CACHE_TTL)
+
+    @staticmethod
+    def tag(user_id):
+        return f'user:{user_id}'
+
+    def get(self, user_id):
+        """CurrentUser for `user_id`, or None when the user no longer exists"""
+        return self.cache.get_or_set(user_id, lambda: self._load(user_id), tags=[self.tag(user_id)])
+
+    def _load(self, user_id):
+        user = self.db.execute_single("SELECT * FROM users WHERE id = ?", (user_id,))
+        if user is None:
+            return None
+        user.pop('password', None)  # never kept in a cache
+        profile = self.db.execute_single("SELECT * FROM alumni_profiles WHERE user_id = ?", (user_id,))
+        return CurrentUser(user, profile)
+
+    def invalidate(self, *user_ids):
+        self.cache.invalidate(*(self.tag(user_id) for user_id in user_ids))
@@ -0,0 +1,11 @@
+"""WSGI entry point:  gunicorn -c gunicorn.conf.py  (or any WSGI server: wsgi:application)
+
+When the gunicorn master has already checked the schema it sets
+SCHEMA_READY=1, and workers skip the DDL.
+"""
+
+import os
+
+from app import create_app
+
+application = create_app(init_schema=os.environ.get('SCHEMA_READY') != '1')